@@ -17,6 +17,11 @@ class Cursor(Structure):
     """
     _fields_ = [("_kind_id", c_int), ("xdata", c_int), ("data", c_void_p * 3)]
 
+    # Results of the callback of walk (CXChildVisitResult)
+    VISIT_BREAK = 0
+    VISIT_CONTINUE = 1
+    VISIT_RECURSE = 2
+
     @staticmethod
     def from_location(tu, location):
         # We store a reference to the TU in the instance so the TU won't get
@@ -27,6 +32,9 @@ class Cursor(Structure):
         return cursor
 
     def __eq__(self, other):
+        if not isinstance(other, Cursor):
+            return False
+
         return conf.lib.clang_equalCursors(self, other)
 
     def __ne__(self, other):
@@ -361,6 +369,11 @@ class Cursor(Structure):
         """Returns the raw comment text associated with that Cursor"""
         return conf.lib.clang_Cursor_getRawCommentText(self)
 
+    @property
+    def comment_extent(self):
+        """Returns the source range of the raw comment associated with that Cursor"""
+        return conf.lib.clang_Cursor_getCommentRange(self)
+
     def get_arguments(self):
         """Return an iterator for accessing the arguments of this cursor."""
         num_args = conf.lib.clang_Cursor_getNumArguments(self)
@@ -410,6 +423,37 @@ class Cursor(Structure):
                                      children)
         return iter(children)
 
+    def walk(self, callback):
+        """Walk the descendants of this cursor in a single depth-first pass.
+
+        callback(cursor, parent) is called for every visited cursor and
+        returns VISIT_RECURSE for visiting the children of the cursor,
+        VISIT_CONTINUE for skipping them or VISIT_BREAK for stopping the
+        walk. An exception raised by the callback stops the walk and is
+        raised again from walk.
+        """
+        error = []
+
+        def visitor(child, parent, _):
+            assert child != conf.lib.clang_getNullCursor()
+
+            # Create reference to TU so it isn't GC'd before Cursor.
+            child._tu = self._tu
+            parent._tu = self._tu
+
+            try:
+                return callback(child, parent)
+            except BaseException as e:
+                error.append(e)
+                return Cursor.VISIT_BREAK
+
+        from Clang.prototypes.functions import callbacks
+
+        conf.lib.clang_visitChildren(self, callbacks['cursor_visit'](visitor), None)
+
+        if error:
+            raise error[0]
+
     def walk_preorder(self):
         """Depth-first preorder walk over the cursor and its descendants.
 
@@ -39,5 +39,9 @@ class BaseEnumeration(object):
             raise ValueError('Unknown template argument kind %d' % id)
         return cls._kinds[id]
 
+    def __reduce__(self):
+        # The values are compared by identity, unpickle to the loaded instance
+        return self.__class__.from_id, (self.value,)
+
     def __repr__(self):
         return '{}.{}'.format(self.__class__, self.name)
\ No newline at end of file
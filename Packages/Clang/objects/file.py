@@ -1,3 +1,5 @@
+from ctypes import c_void_p, cast
+
 from Clang.config import conf
 from Clang.objects.clang_object import ClangObject
 
@@ -18,6 +20,15 @@ class File(ClangObject):
         """Return the complete file and path name of the file."""
         return conf.lib.clang_getFileName(self)
 
+    @property
+    def handle(self):
+        """
+        Return the address of the underlying CXFile. Within a translation
+        unit every file has one CXFile, so the handle identifies the file
+        without retrieving its name.
+        """
+        return cast(self.obj, c_void_p).value
+
     @property
     def time(self):
         """Return the last modification time of the file."""
@@ -114,8 +114,11 @@ class TranslationUnit(ClangObject):
                 if hasattr(contents, "read"):
                     contents = contents.read()
 
+                # The length is in bytes
+                contents = b(contents)
+
                 unsaved_array[i].name = b(name)
-                unsaved_array[i].contents = b(contents)
+                unsaved_array[i].contents = contents
                 unsaved_array[i].length = len(contents)
 
         ptr = conf.lib.clang_parseTranslationUnit(index, filename, args_array,
@@ -306,6 +309,11 @@ class TranslationUnit(ClangObject):
         ptr = conf.lib.clang_reparseTranslationUnit(self, len(unsaved_files),
                                                     unsaved_files_array, options)
 
+        # The translation unit is invalid after a failure, it can only be
+        # disposed
+        if ptr != 0:
+            raise TranslationUnitLoadError('Error reparsing translation unit.')
+
     def save(self, filename):
         """Saves the TranslationUnit to a file.
 
@@ -387,3 +395,10 @@ class TranslationUnit(ClangObject):
             extent = SourceRange(start=locations[0], end=locations[1])
 
         return TokenGroup.get_tokens(self, extent)
+
+    def get_annotated_tokens(self, extent):
+        """Obtain the tokens in an extent of this translation unit, as a
+        list of (Token, Cursor) pairs, the cursor being the one the token
+        corresponds to.
+        """
+        return TokenGroup.get_annotated_tokens(self, extent)
@@ -710,6 +710,10 @@ functionList = [
      _CXString,
      _CXString.from_result),
 
+    ("clang_Cursor_getCommentRange",
+     [Cursor],
+     SourceRange),
+
     ("clang_Cursor_getOffsetOfField",
      [Cursor],
      c_longlong),
@@ -11,6 +11,8 @@
 # this program; if not, write to the Free Software Foundation, Inc., 51
 # Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 
+from collections import deque
+
 from Clang.kinds.access_specifier import AccessSpecifier
 from Clang.kinds.cursor_kind import CursorKind
 from Nodes.node import Node
@@ -62,30 +64,78 @@ class Class(Node):
                 b.node.implemented_by.append(self)
 
     @property
-    def resolve_nodes(self):
-        for child in Node.resolve_nodes.fget(self):
-            yield child
-
+    def inherited_scopes(self):
         for base in self._all_bases():
             if base.node and base.access != AccessSpecifier.PRIVATE:
                 yield base.node
 
-                for child in base.node.resolve_nodes:
-                    yield child
-
     def append(self, child):
         super(Class, self).append(child)
 
         if isinstance(child, Method):
             self.name_to_method[child.name] = child
 
+    def snapshot(self, snapshot):
+        super(Class, self).snapshot(snapshot)
+
+        for b in self._all_bases():
+            b.cursor = snapshot.cursor(b.cursor)
+            b.type.snapshot(snapshot)
+
+    def find_overrides(self, names):
+        """
+        Looks up the methods overridden by the methods of this class named
+        names. The bases are visited breadth first, a base defining a method
+        ends the lookup of that name in its own bases.
+        :return: Map from the names to the overridden methods, in order.
+        """
+        found = {}
+        names = set(names)
+
+        if not names:
+            return found
+
+        # The bases still to visit with the names still looked up in them
+        queue = deque((b, names) for b in self.bases)
+
+        while queue:
+            b, names = queue.popleft()
+
+            if not b.node:
+                continue
+
+            b = b.node
+            remaining = set()
+
+            for name in names:
+                if name in b.name_to_method:
+                    found.setdefault(name, []).append(b.name_to_method[name])
+                else:
+                    remaining.add(name)
+
+            if remaining:
+                queue.extend((base, remaining) for base in b.bases)
+
+        return found
+
+    def resolve_overrides(self):
+        """
+        Sets the methods overridden by the methods of this class, once the
+        bases are resolved.
+        """
+        methods = list(self.methods)
+        found = self.find_overrides(m.name for m in methods)
+
+        for m in methods:
+            m.override = found.get(m.name, [])
+
     @property
     def methods(self):
         for child in self.children:
             if isinstance(child, Method):
                 yield child
 
-    def visit(self, cursor, citer):
+    def visit(self, cursor):
         if cursor.kind == CursorKind.CXX_ACCESS_SPEC_DECL:
             self.current_access = cursor.access_specifier
             return []
@@ -94,7 +144,7 @@ class Class(Node):
             self.bases.append(Class.Base(cursor.type.get_declaration(), cursor.access_specifier))
             return []
 
-        return Node.visit(self, cursor, citer)
+        return Node.visit(self, cursor)
 
     @property
     def force_page(self):
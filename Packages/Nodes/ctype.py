@@ -208,6 +208,26 @@ class Type(Node):
         else:
             self._typename = ''
 
+    def snapshot(self, snapshot):
+        # The declaration, the cursor and the subtypes are all that is
+        # used once extracted
+        self.tp = None
+        self._decl = snapshot.cursor(self._decl)
+        self._cursor = snapshot.cursor(self._cursor)
+
+        if self.is_constant_array:
+            self._element_type.snapshot(snapshot)
+
+        if self._is_template:
+            for template_argument in self._template_arguments:
+                template_argument.snapshot(snapshot)
+
+        if self.is_function:
+            self._result.snapshot(snapshot)
+
+            for argument in self._arguments:
+                argument.snapshot(snapshot)
+
     @property
     def builtin(self):
         return self._builtin
@@ -26,4 +26,8 @@ class Field(Node):
     def compare_same(self, other):
         return cmp(self.sort_index, other.sort_index)
 
+    def snapshot(self, snapshot):
+        super(Field, self).snapshot(snapshot)
+        self.type.snapshot(snapshot)
+
 # vi:ts=4:et
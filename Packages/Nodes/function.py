@@ -106,7 +106,7 @@ class Function(Node):
         return parent
 
     @property
-    def resolve_nodes(self):
+    def direct_resolve_nodes(self):
         for arg in self._arguments:
             yield arg
 
@@ -126,6 +126,15 @@ class Function(Node):
             if post.name == 'return':
                 self._comment.returns = post.description
 
+    def snapshot(self, snapshot):
+        super(Function, self).snapshot(snapshot)
+
+        self._return_type.snapshot(snapshot)
+
+        for arg in self._arguments:
+            arg.cursor = snapshot.cursor(arg.cursor)
+            arg.type.snapshot(snapshot)
+
     @property
     def return_type(self):
         return self._return_type
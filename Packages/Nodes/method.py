@@ -10,6 +10,7 @@
 # You should have received a copy of the GNU General Public License along with
 # this program; if not, write to the Free Software Foundation, Inc., 51
 # Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import os
 
 from Clang.kinds.cursor_kind import CursorKind
 from Nodes.function import Function
@@ -17,8 +18,57 @@ from Nodes.node import Node
 from Pydoc.comments.comment import Comment
 
 
+def has_skipped_body(cursor) -> bool:
+    """
+    Whether the declaration is followed by a body. When parsing with
+    PARSE_SKIP_FUNCTION_BODIES, the extent of a function ends before its body
+    and the function is not a definition, the body is looked for in the
+    tokens following the declaration instead.
+    """
+    end = cursor.extent.end
+
+    if end.file is None:
+        return False
+
+    filename = end.file.name
+
+    try:
+        size = os.path.getsize(filename)
+    except OSError:
+        return False
+
+    tu = cursor.translation_unit
+    window = 64
+
+    while True:
+        stop = min(end.offset + window, size)
+        tokens = list(tu.get_tokens(extent=tu.get_extent(filename, (end.offset, stop))))
+
+        # The last token might be cut by the window
+        if stop < size:
+            tokens = tokens[:-1]
+
+        for token in tokens:
+            spelling = token.spelling
+
+            # The body, the initializers of a constructor or a function try
+            # block
+            if spelling in ('{', ':', 'try'):
+                return True
+            elif spelling == ';':
+                return False
+
+        if stop == size:
+            return False
+
+        window *= 4
+
+
 class Method(Function):
     kind = CursorKind.CXX_METHOD
+    # Set by the Tree while visiting a translation unit parsed with
+    # PARSE_SKIP_FUNCTION_BODIES, see has_skipped_body
+    skipped_bodies: bool = False
 
     def __init__(self, cursor, comment):
         super(Method, self).__init__(cursor, comment)
@@ -28,6 +78,8 @@ class Method(Function):
 
         self.abstract = True
         self._override = None
+        # Whether an @inherit comment was looked up, see resolve_inherit
+        self._inherit_resolved = False
 
         self.update_abstract(cursor)
 
@@ -37,55 +89,55 @@ class Method(Function):
 
     @property
     def override(self):
-        if not self._override is None:
-            return self._override
-
-        # Lookup in bases, recursively
-        bases = list(self.parent.bases)
-        mname = self.name
+        if self._override is None:
+            # Not set by the parent (see Class.resolve_overrides)
+            self._override = self.parent.find_overrides([self.name]).get(self.name, [])
 
-        self._override = []
+        return self._override
 
-        while len(bases) > 0:
-            b = bases[0]
-            bases = bases[1:]
+    @override.setter
+    def override(self, value):
+        self._override = value
 
-            if not b.node:
-                continue
+    def resolve_inherit(self):
+        """
+        Replaces an @inherit comment by the comment of the first overridden
+        method having one.
+        """
+        cm = Function.comment.fget(self)
 
-            b = b.node
+        if cm and cm.text.strip() == '@inherit':
+            for ov in self.override:
+                # Resolved again, its comment might have been merged since
+                ov.resolve_inherit()
+                ovcm = Function.comment.fget(ov)
 
-            if mname in b.name_to_method:
-                self._override.append(b.name_to_method[mname])
-            else:
-                # Look in the bases of bases also
-                bases = bases + b.bases
+                if ovcm:
+                    self.merge_comment(Comment(ovcm.text, ovcm.location), True)
+                    break
 
-        return self._override
+        self._inherit_resolved = True
 
     @property
     def comment(self):
-        cm = Function.comment.fget(self)
+        if not self._inherit_resolved:
+            self.resolve_inherit()
 
-        if not cm:
-            return cm
+        return Function.comment.fget(self)
 
-        if cm.text.strip() == '@inherit':
-            for ov in self.override:
-                ovcm = ov.comment
-
-                if ovcm:
-                    self.merge_comment(Comment(ovcm.text, ovcm.location), True)
-                    return self._comment
-
-        return cm
+    def merge_comment(self, comment, override=False):
+        super(Method, self).merge_comment(comment, override)
+        self._inherit_resolved = False
 
     @property
     def semantic_parent(self):
         return Node.semantic_parent.fget(self)
 
     def update_abstract(self, cursor):
-        if cursor.is_definition() or cursor.get_definition():
+        if not self.abstract:
+            return
+
+        if cursor.is_definition() or cursor.get_definition() or (Method.skipped_bodies and has_skipped_body(cursor)):
             self.abstract = False
 
     def add_ref(self, cursor):
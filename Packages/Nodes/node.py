@@ -189,7 +189,7 @@ class Node(object):
         return ret
 
     @property
-    def resolve_nodes(self):
+    def direct_resolve_nodes(self):
         for child in self.children:
             yield child
 
@@ -197,6 +197,21 @@ class Node(object):
                 for ev in child.children:
                     yield ev
 
+    @property
+    def inherited_scopes(self):
+        return []
+
+    @property
+    def resolve_nodes(self):
+        for child in self.direct_resolve_nodes:
+            yield child
+
+        for scope in self.inherited_scopes:
+            yield scope
+
+            for child in scope.resolve_nodes:
+                yield child
+
     @property
     def name(self):
         if self.cursor is None:
@@ -284,9 +299,22 @@ class Node(object):
             self.num_anon += 1
             child.anonymous_id = self.num_anon
 
-    def visit(self, cursor, citer):
+    def visit(self, cursor):
         return None
 
+    def snapshot(self, snapshot):
+        """
+        Replace the libclang objects referred by the node with the plain copies
+        of the given Pydoc.snapshot.Snapshot, after which the node does not
+        need its translation unit anymore.
+        """
+        self.cursor = snapshot.cursor(self.cursor)
+        self._refs = [snapshot.cursor(ref) for ref in self._refs]
+        self._comment_locations = [snapshot.location(location) for location in self._comment_locations]
+
+        if not self._comment is None:
+            self._comment.detach()
+
     def merge_comment(self, comment, override=False):
         if not comment:
             return
@@ -39,6 +39,12 @@ class TemplateTypeParameter(Node):
     def default_type(self):
         return self._default_type
 
+    def snapshot(self, snapshot):
+        super(TemplateTypeParameter, self).snapshot(snapshot)
+
+        if not self._default_type is None:
+            self._default_type.snapshot(snapshot)
+
     @property
     def access(self):
         return AccessSpecifier.PUBLIC
@@ -90,6 +96,10 @@ class TemplateNonTypeParameter(Node):
     def type(self):
         return self._type
 
+    def snapshot(self, snapshot):
+        super(TemplateNonTypeParameter, self).snapshot(snapshot)
+        self._type.snapshot(snapshot)
+
     @property
     def default_value(self):
         return self._default_value
@@ -32,4 +32,8 @@ class Typedef(Node):
 
         self.type = Type(cursor.underlying_typedef_type, typecursor)
 
+    def snapshot(self, snapshot):
+        super(Typedef, self).snapshot(snapshot)
+        self.type.snapshot(snapshot)
+
 # vi:ts=4:et
@@ -24,4 +24,8 @@ class Variable(Node):
 
         self.type = Type(cursor.type, cursor=cursor)
 
+    def snapshot(self, snapshot):
+        super(Variable, self).snapshot(snapshot)
+        self.type.snapshot(snapshot)
+
 # vi:ts=4:et
@@ -0,0 +1,179 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+from Clang.exceptions.translation_unit import TranslationUnitSaveError
+from Clang.objects.translation_unit import TranslationUnit
+from Pydoc.cache.digest import file_digest
+from Pydoc.util.Struct import Struct
+
+
+class AstCache(object):
+    """
+    Content addressed cache of parsed translation units, stored with
+    TranslationUnit.save in a directory that is kept between runs.
+
+    An entry is identified by the contents of the source file, the contents
+    of every file it includes (transitively) and the flags used for parsing.
+    The includes are only known after parsing, so the lookup is done in two
+    steps: the source file and flags give the list of includes recorded by
+    the last parse, and the contents of those includes give the entry.
+    """
+
+    Entry = Struct.define('Entry', key='', ast='', includes=[], diagnostics=[])
+
+    def __init__(self, directory: str):
+        self.directory: str = directory
+        # Digest of the contents of the files, computed once per run
+        self._digests: Dict[str, Optional[str]] = {}
+
+        os.makedirs(directory, exist_ok=True)
+
+    def digest(self, path: str) -> Optional[str]:
+        """
+        :param path: The path to a file.
+        :return: The hash of the contents of the file, or None if the file
+         can not be read.
+        """
+        if not path in self._digests:
+            self._digests[path] = file_digest(path)
+
+        return self._digests[path]
+
+    @staticmethod
+    def _hash(parts: List[str]) -> str:
+        h = hashlib.sha256()
+
+        for part in parts:
+            h.update(part.encode('utf-8'))
+            h.update(b'\0')
+
+        return h.hexdigest()
+
+    def _source_key(self, filename: str, flags: List[str], options: int) -> Optional[str]:
+        content = self.digest(filename)
+
+        if content is None:
+            return None
+
+        return self._hash([filename, content, str(options)] + list(flags))
+
+    def _key(self, source_key: str, includes: List[str]) -> Optional[str]:
+        parts = [source_key]
+
+        for include in includes:
+            content = self.digest(include)
+
+            if content is None:
+                return None
+
+            parts += [include, content]
+
+        return self._hash(parts)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_json(self, name: str):
+        try:
+            with open(self._path(name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_json(self, name: str, data) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+        os.replace(tmp, self._path(name))
+
+    def lookup(self, filename: str, flags: List[str], options: int = 0) -> Optional[Entry]:
+        """
+        :return: The cached entry for the file, or None if the file, or any
+         of the files it includes, changed since it was stored.
+        """
+        source_key = self._source_key(filename, flags, options)
+
+        if source_key is None:
+            return None
+
+        includes = self._read_json(source_key + '.deps')
+
+        if includes is None:
+            return None
+
+        key = self._key(source_key, includes)
+
+        if key is None:
+            return None
+
+        meta = self._read_json(key + '.json')
+        ast = self._path(key + '.ast')
+
+        if meta is None or not os.path.exists(ast):
+            return None
+
+        return AstCache.Entry(key=key, ast=ast, includes=meta['includes'],
+                              diagnostics=[tuple(d) for d in meta['diagnostics']])
+
+    def store(self, filename: str, flags: List[str], options: int, translation_unit: TranslationUnit,
+              includes: List[str], diagnostics) -> Optional[str]:
+        """
+        Save a parsed translation unit in the cache.
+        :return: The path to the saved AST file, or None if it could not
+         be saved.
+        """
+        source_key = self._source_key(filename, flags, options)
+
+        if source_key is None:
+            return None
+
+        key = self._key(source_key, includes)
+
+        if key is None:
+            return None
+
+        ast = self._path(key + '.ast')
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+
+        try:
+            translation_unit.save(tmp)
+        except TranslationUnitSaveError:
+            os.unlink(tmp)
+            return None
+
+        os.replace(tmp, ast)
+
+        self._write_json(key + '.json', {'includes': includes, 'diagnostics': [list(d) for d in diagnostics]})
+        self._write_json(source_key + '.deps', includes)
+
+        return ast
+
+    def evict(self, entry: Entry) -> None:
+        """
+        Remove an entry that could not be loaded.
+        """
+        for name in (entry.key + '.json', entry.key + '.ast'):
+            try:
+                os.unlink(self._path(name))
+            except OSError:
+                pass
+
+# vi:ts=4:et
@@ -0,0 +1,101 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import json
+import os
+import tempfile
+from typing import Optional
+
+from Clang.objects.translation_unit import TranslationUnit
+from Pydoc.cache.digest import file_digest
+from Pydoc.comments.comments_database import CommentsDatabase
+from Pydoc.util.location import Location
+
+
+class CommentsCache(object):
+    """
+    Cache of the comments extracted from the files, kept between runs. An
+    entry is identified by the contents of the file only (the comments do
+    not depend on how the file is parsed), so a file that did not change is
+    never scanned again, even when a translation unit including it has to be
+    parsed again.
+    """
+
+    VERSION = 1
+
+    def __init__(self, directory: str):
+        self.directory: str = directory
+
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, digest: str, instructions_only: bool) -> str:
+        return os.path.join(self.directory, '{}{}.json'.format(digest, '-instructions' if instructions_only else ''))
+
+    def lookup(self, filename: str, digest: str, instructions_only: bool = False) -> Optional[CommentsDatabase]:
+        """
+        :return: The comments database stored for the contents of the file,
+         or None if there is none.
+        """
+        try:
+            with open(self._path(digest, instructions_only), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get('version') != CommentsCache.VERSION:
+            return None
+
+        return CommentsDatabase.from_state({
+            'filename': filename,
+            'comments': [(text, Location(filename, line, column, offset))
+                         for text, line, column, offset in data['comments']],
+            'categories': data['categories'],
+        })
+
+    def store(self, db: CommentsDatabase, digest: str, instructions_only: bool = False) -> None:
+        state = db.__getstate__()
+
+        data = {
+            'version': CommentsCache.VERSION,
+            'comments': [[text, location.line, location.column, location.offset]
+                         for text, location in state['comments']],
+            'categories': [list(category) for category in state['categories']],
+        }
+
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+        os.replace(tmp, self._path(digest, instructions_only))
+
+    def extract(self, filename: str, tu: TranslationUnit, instructions_only: bool = False) -> CommentsDatabase:
+        """
+        :return: The comments database of the file, from the cache if the
+         file did not change, otherwise extracted and stored.
+        """
+        digest = file_digest(filename)
+
+        if digest is not None:
+            db = self.lookup(filename, digest, instructions_only)
+
+            if db is not None:
+                return db
+
+        db = CommentsDatabase(filename, tu, instructions_only=instructions_only)
+
+        if digest is not None:
+            self.store(db, digest, instructions_only)
+
+        return db
+
+# vi:ts=4:et
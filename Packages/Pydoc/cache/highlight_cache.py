@@ -0,0 +1,65 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import json
+import os
+import tempfile
+from typing import List, Optional, Tuple
+
+
+class HighlightCache(object):
+    """
+    Cache of the highlighting of the code examples of the comments, kept
+    between runs. An entry is identified by the digest of the text of the
+    example and of the flags it was parsed with (see highlight.digest).
+    """
+
+    VERSION = 1
+
+    def __init__(self, directory: str):
+        self.directory: str = directory
+
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, '{}.json'.format(digest))
+
+    def lookup(self, digest: str) -> Optional[List[Tuple[int, int, str]]]:
+        """
+        :return: The highlighted ranges stored for the digest, or None if
+         there are none.
+        """
+        try:
+            with open(self._path(digest), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get('version') != HighlightCache.VERSION:
+            return None
+
+        return [(start, end, kind) for start, end, kind in data['highlights']]
+
+    def store(self, digest: str, highlights: List[Tuple[int, int, str]]) -> None:
+        data = {
+            'version': HighlightCache.VERSION,
+            'highlights': [list(h) for h in highlights],
+        }
+
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+        os.replace(tmp, self._path(digest))
+
+# vi:ts=4:et
@@ -0,0 +1,163 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+from Pydoc.cache.digest import file_digest
+
+
+class Manifest(object):
+    """
+    Record of the last generation, kept in the output directory.
+
+    It stores the hash of every parsed file and of the files it includes
+    (the dependency graph given by TranslationUnit.get_includes), the flags
+    used for parsing every file and the digest of every written XML page. The
+    state of the previous run is only read, the state of the current run is recorded while generating
+    and replaces it when saved.
+    """
+
+    FILENAME = '.pydoc-manifest.json'
+    VERSION = 1
+
+    def __init__(self, path: str):
+        self.path: str = path
+
+        # Map from parsed file to the flags used for parsing it
+        self.flags: Dict[str, List[str]] = {}
+        # Map from parsed file to the files it includes
+        self.includes: Dict[str, List[str]] = {}
+        # Map from parsed or included file to the hash of its contents
+        self.sources: Dict[str, Optional[str]] = {}
+        # Map from XML page to the hash of its contents
+        self.pages: Dict[str, str] = {}
+
+        self._previous = {'flags': {}, 'includes': {}, 'sources': {}, 'pages': {}}
+        self._digests: Dict[str, Optional[str]] = {}
+
+    @staticmethod
+    def load(directory: str) -> 'Manifest':
+        """
+        :param directory: The output directory.
+        :return: The manifest of the directory, holding the state of the
+         previous run if there was one.
+        """
+        manifest = Manifest(os.path.join(directory, Manifest.FILENAME))
+
+        try:
+            with open(manifest.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+
+        if isinstance(data, dict) and data.get('version') == Manifest.VERSION:
+            for key in manifest._previous:
+                manifest._previous[key] = data.get(key, manifest._previous[key])
+
+        return manifest
+
+    def save(self) -> None:
+        data = {
+            'version': Manifest.VERSION,
+            'flags': self.flags,
+            'includes': self.includes,
+            'sources': self.sources,
+            'pages': self.pages,
+        }
+
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+
+        os.replace(tmp, self.path)
+
+    def restart(self) -> None:
+        """
+        Start a new run in the same process, the state recorded so far
+        becomes the state of the previous run.
+        """
+        self._previous = {
+            'flags': self.flags,
+            'includes': self.includes,
+            'sources': self.sources,
+            'pages': self.pages,
+        }
+
+        self.flags = {}
+        self.includes = {}
+        self.sources = {}
+        self.pages = {}
+        self._digests = {}
+
+    def digest(self, path: str) -> Optional[str]:
+        if not path in self._digests:
+            self._digests[path] = file_digest(path)
+
+        return self._digests[path]
+
+    def is_affected(self, filename: str, flags: List[str]) -> bool:
+        """
+        :param filename: A file to parse.
+        :param flags: The flags used for parsing the file.
+        :return: True if the file, or any of the files it included in the
+         previous run, changed since then (or if the flags changed).
+        """
+        if self._previous['flags'].get(filename) != list(flags):
+            return True
+
+        includes = self._previous['includes'].get(filename)
+
+        if includes is None:
+            return True
+
+        for f in [filename] + includes:
+            previous = self._previous['sources'].get(f)
+
+            if previous is None or previous != self.digest(f):
+                return True
+
+        return False
+
+    def record_source(self, filename: str, flags: List[str], includes: List[str]) -> None:
+        """
+        Record a parsed file together with its flags and the files it includes.
+        """
+        self.flags[filename] = list(flags)
+        self.includes[filename] = list(includes)
+
+        for f in [filename] + self.includes[filename]:
+            self.sources[f] = self.digest(f)
+
+    def record_page(self, page: str, digest: str) -> bool:
+        """
+        Record the digest of a generated page.
+        :return: True if the page has the same contents as in the previous run.
+        """
+        self.pages[page] = digest
+
+        return self._previous['pages'].get(page) == digest
+
+    def stale_pages(self) -> List[str]:
+        """
+        :return: The pages written by the previous run that were not
+         generated by this one.
+        """
+        return sorted(page for page in self._previous['pages'] if not page in self.pages)
+
+# vi:ts=4:et
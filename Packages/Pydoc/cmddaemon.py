@@ -0,0 +1,309 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Long running process generating the documentation on request.
+
+The daemon keeps libclang loaded, a single Index and, for every distinct
+generate command line, the translation units and the last processed tree (see
+Watcher), so a repeated command only reparses what changed. Clients send one
+JSON request per connection on a Unix socket and receive one JSON response
+with the output and the exit status of the command.
+"""
+from __future__ import absolute_import
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import time
+import traceback
+from collections import OrderedDict
+from typing import Callable, List
+
+
+def _check_owner(path: str, st: os.stat_result, private: bool = False):
+    """
+    Exits unless path is owned by the user (and, if private, only accessible
+    by the user): another user could have created it to receive the
+    requests, which run commands and write files.
+    """
+    if st.st_uid != os.getuid() or (private and st.st_mode & 0o077):
+        sys.stderr.write("`{}' is not private to the user, not using it\n".format(path))
+        sys.exit(1)
+
+
+def _user_directory() -> str:
+    """
+    :return: The directory of the sockets of the user when there is no
+     runtime directory, created accessible only by the user in the shared
+     temporary directory.
+    """
+    path = os.path.join(tempfile.gettempdir(), 'pydoc-{}'.format(os.getuid()))
+
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+
+    st = os.lstat(path)
+
+    if not stat.S_ISDIR(st.st_mode):
+        sys.stderr.write("`{}' is not a directory\n".format(path))
+        sys.exit(1)
+
+    _check_owner(path, st, True)
+
+    return path
+
+
+def default_socket() -> str:
+    directory = os.environ.get('XDG_RUNTIME_DIR')
+
+    if directory:
+        return os.path.join(directory, 'pydoc-{}.sock'.format(os.getuid()))
+
+    return os.path.join(_user_directory(), 'pydoc.sock')
+
+
+class Daemon(object):
+    """
+    The state kept between the requests, the sessions map a working
+    directory and command line to the Watcher keeping its files.
+    """
+
+    # Number of command lines for which the processed files are kept
+    SESSIONS = 8
+
+    def __init__(self):
+        # Loads libclang and registers the prototypes once
+        from Clang.objects.index import Index
+        import Pydoc.tree
+
+        self.index = Index.create()
+        self.sessions: OrderedDict = OrderedDict()
+        self.started: float = time.time()
+        self.stopped: bool = False
+
+    def update(self, args: List[str], create_tree: Callable, generate: Callable, merge: List[str],
+               files: Callable):
+        """
+        Called by cmdgenerate.run, generates using the session of the command
+        line (creating it if needed).
+        """
+        from Pydoc.watch import Watcher
+
+        key = (os.getcwd(), tuple(args))
+        watcher = self.sessions.pop(key, None)
+
+        if watcher is None:
+            watcher = Watcher(create_tree, generate, merge, files=files)
+
+            while len(self.sessions) >= Daemon.SESSIONS:
+                self.sessions.popitem(last=False)[1].close()
+        else:
+            # The functions of this request, with the files expanded again
+            # and the manifest loaded again
+            watcher.create_tree = create_tree
+            watcher.generate = generate
+            watcher.merge = merge
+            watcher.files = files
+
+        self.sessions[key] = watcher
+        watcher.update(force=True)
+
+    def generate(self, args: List[str]) -> int:
+        from Pydoc import cmdgenerate
+
+        cmdgenerate.run(args, daemon=self)
+        return 0
+
+    def status(self) -> int:
+        print("Running for {:.0f} seconds, {} sessions".format(time.time() - self.started, len(self.sessions)))
+
+        for cwd, args in self.sessions:
+            print("  {}: {}".format(cwd, ' '.join(args)))
+
+        return 0
+
+    def stop(self) -> int:
+        self.stopped = True
+
+        for watcher in self.sessions.values():
+            watcher.close()
+
+        print("Stopped")
+        return 0
+
+    def handle(self, request: dict) -> dict:
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        cwd = os.getcwd()
+
+        try:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    os.chdir(request.get('cwd', cwd))
+                    command = request.get('command')
+
+                    if command == 'generate':
+                        status = self.generate(request.get('args', []))
+                    elif command == 'status':
+                        status = self.status()
+                    elif command == 'stop':
+                        status = self.stop()
+                    else:
+                        sys.stderr.write("Unknown daemon command `{}'\n".format(command))
+                        status = 1
+                except SystemExit as e:
+                    if e.code is None or isinstance(e.code, int):
+                        status = e.code or 0
+                    else:
+                        sys.stderr.write('{}\n'.format(e.code))
+                        status = 1
+                except Exception:
+                    traceback.print_exc()
+                    status = 1
+        finally:
+            os.chdir(cwd)
+
+        return {'status': status, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+
+def _handler(daemon: Daemon):
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline().decode('utf-8'))
+            except ValueError:
+                return
+
+            response = daemon.handle(request)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+    return Handler
+
+
+def request(path: str, command: str, args: List[str] = None) -> dict:
+    """
+    Sends a request to the daemon listening on path.
+    """
+    message = {'command': command, 'args': args or [], 'cwd': os.getcwd()}
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(path)
+        s.sendall(json.dumps(message).encode('utf-8') + b'\n')
+
+        with s.makefile('rb') as f:
+            return json.loads(f.readline().decode('utf-8'))
+
+
+def _running(path: str) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(path)
+    except OSError:
+        return False
+
+    return True
+
+
+def _remove_stale(path: str):
+    """
+    Removes the socket left behind by a daemon that did not stop cleanly,
+    exits if a daemon is listening on it.
+    """
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+
+    if _running(path):
+        sys.stderr.write("A daemon is already listening on `{}'\n".format(path))
+        sys.exit(1)
+
+    _check_owner(path, st)
+    os.unlink(path)
+
+
+def listen(path: str, daemon: Daemon) -> socketserver.UnixStreamServer:
+    """
+    Creates the socket of the daemon, accessible only by the user.
+    """
+    mask = os.umask(0o077)
+
+    try:
+        return socketserver.UnixStreamServer(path, _handler(daemon))
+    finally:
+        os.umask(mask)
+
+
+def serve(path: str):
+    _remove_stale(path)
+
+    daemon = Daemon()
+    server = listen(path, daemon)
+
+    print("Listening on {}".format(path))
+
+    try:
+        while not daemon.stopped:
+            server.handle_request()
+    except KeyboardInterrupt:
+        daemon.stop()
+    finally:
+        server.server_close()
+
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def run(args):
+    parser = argparse.ArgumentParser(description='clang based documentation generator.',
+                                     usage='%(prog)s daemon [--socket PATH] start|stop|status|generate [ARGS]')
+
+    parser.add_argument('--socket', default=None, metavar='PATH',
+                        help='the Unix socket of the daemon (default $XDG_RUNTIME_DIR/pydoc-UID.sock, or '
+                             'pydoc.sock in a pydoc-UID directory private to the user in the temporary '
+                             'directory)')
+
+    parser.add_argument('action', choices=['start', 'stop', 'status', 'generate'],
+                        help='start the daemon in the foreground, or send it a command (generate takes the same '
+                             'arguments as the generate command)')
+
+    parser.add_argument('args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+
+    opts = parser.parse_args(args)
+    path = opts.socket or default_socket()
+
+    if opts.action == 'start':
+        serve(path)
+        return
+
+    try:
+        response = request(path, opts.action, opts.args)
+    except OSError as e:
+        sys.stderr.write("Could not connect to the daemon on `{}': {}\n".format(path, e))
+        sys.exit(1)
+
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+
+    sys.exit(response['status'])
+
+# vi:ts=4:et
@@ -13,9 +13,16 @@
 from __future__ import absolute_import
 
 import argparse
+import contextlib
 import os
 import sys
 
+from Clang.exceptions.compilation_database import CompilationDatabaseError
+from Pydoc.cache.ast_cache import AstCache
+from Pydoc.cache.comments_cache import CommentsCache
+from Pydoc.cache.highlight_cache import HighlightCache
+from Pydoc.cache.manifest import Manifest
+from Pydoc.files.compile_commands import CompileCommands
 from Pydoc.files.provider_source import ProviderSource
 from Pydoc.tree import Tree
 from Pydoc import fs, staticsite
@@ -45,7 +52,11 @@ def run_generate(t: Tree, opts):
             staticsite.generate(baseout, opts)
 
 
-def run(args):
+def run(args, daemon=None):
+    """
+    :param daemon: The daemon running the command, which keeps the index and
+     the processed files between the commands.
+    """
     try:
         sep = args.index('--')
     except ValueError:
@@ -96,6 +107,55 @@ def run(args):
     parser.add_argument('--custom-css', default=[], metavar='FILES', action='append',
                         help='specify additional css files to be merged into the html (only for when --output is html)')
 
+    parser.add_argument('--jobs', default=1, type=int, metavar='N',
+                        help='number of processes used for parsing the files and generating the pages '
+                             '(default 1)')
+
+    parser.add_argument('--cache-dir', default=None, metavar='DIR',
+                        help='directory where parsed files are cached between runs')
+
+    parser.add_argument('--incremental', default=False, action='store_const', const=True,
+                        help='only reparse the files that changed and only rewrite the pages that changed since the '
+                             'previous run in the output directory (the cache directory defaults to '
+                             'OUTPUT/.pydoc-cache)')
+
+    parser.add_argument('--compile-commands', default=None, metavar='DIR',
+                        help='directory containing a compile_commands.json with the flags of every file, the '
+                             'CXXFLAGS are only used for the files that are not in it')
+
+    parser.add_argument('--only-compile-commands', default=False, action='store_const', const=True,
+                        help='only parse the files that are in the compile commands (comments are still '
+                             'extracted from every file)')
+
+    parser.add_argument('--fast-parse', default=False, action='store_const', const=True,
+                        help='skip the bodies of the functions when parsing (and allow incomplete headers), '
+                             'only the declarations are needed for the documentation')
+
+    parser.add_argument('--libclang-comments', default=False, action='store_const', const=True,
+                        help='use the comments libclang attaches to the declarations instead of scanning the '
+                             'files for them (the files are still scanned for Pydoc instructions)')
+
+    parser.add_argument('--include-cache', default=None, metavar='FILE',
+                        help='file where the include paths of clang++ are cached between runs (default '
+                             '$XDG_CACHE_HOME/pydoc/includepaths.json)')
+
+    parser.add_argument('--refresh-include-cache', default=False, action='store_const', const=True,
+                        help='run clang++ for obtaining the include paths even if they are cached')
+
+    parser.add_argument('--save-tree', default=None, metavar='FILE',
+                        help='save the processed documentation tree, for generating later with --load-tree')
+
+    parser.add_argument('--load-tree', default=None, metavar='FILE',
+                        help='load a tree saved with --save-tree instead of parsing the files')
+
+    parser.add_argument('--watch', default=False, action='store_const', const=True,
+                        help='keep running and regenerate the documentation when the files or the merged files '
+                             'change, only the changed files are reparsed and only the changed pages are '
+                             'rewritten (parses in a single process)')
+
+    parser.add_argument('--watch-interval', default=1.0, type=float, metavar='SECONDS',
+                        help='interval at which the files are checked for changes in watch mode (default 1)')
+
     parser.add_argument('--files', nargs='+',
                         help='files to parse')
 
@@ -105,8 +165,17 @@ def run(args):
     opts = parser.parse_args(restargs)
 
     if opts.quiet:
-        sys.stdout = open(os.devnull, 'w')
+        # Only for this command, the daemon runs many
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            run_options(args, cxxflags, opts, daemon)
+    else:
+        run_options(args, cxxflags, opts, daemon)
+
 
+def run_options(args, cxxflags, opts, daemon=None):
+    """
+    Generates with the parsed command line, see run.
+    """
     log.setLevel(opts.loglevel)
 
     from Pydoc import tree
@@ -129,21 +198,95 @@ def run(args):
         cxxflags += ' -x'
         cxxflags += opts.language
 
-    provider_source = ProviderSource()
-    for directory in opts.files:
-        provider_source.provider_sources(directory)
-    # Sort the files first in sources then in headers
-    provider_source.sort_first_by_sources()
+    def sources() -> ProviderSource:
+        # Expanded for every tree, files are added and removed in watch mode
+        provider_source = ProviderSource()
+        for directory in opts.files or []:
+            provider_source.provider_sources(directory)
+        # Sort the files first in sources then in headers
+        provider_source.sort_first_by_sources()
+
+        return provider_source
+
+    ast_cache = None
+    manifest = None
+
+    # The translation units are kept in memory between the builds
+    keep = opts.watch or daemon is not None
+
+    if keep and opts.load_tree:
+        sys.stderr.write("The --load-tree option cannot be used in watch mode or with the daemon\n")
+        sys.exit(1)
 
-    tree = tree.Tree(provider_source, ''.join(cxxflags))
+    if opts.incremental or keep:
+        manifest = Manifest.load(opts.output)
 
-    tree.process()
+        if not opts.cache_dir:
+            opts.cache_dir = os.path.join(opts.output, '.pydoc-cache')
 
-    if opts.merge:
-        tree.merge(opts.merge_filter, opts.merge)
+    if opts.cache_dir and not keep:
+        ast_cache = AstCache(os.path.join(opts.cache_dir, 'ast'))
+
+    comments_cache = None
+    highlight_cache = None
+
+    if opts.cache_dir:
+        comments_cache = CommentsCache(os.path.join(opts.cache_dir, 'comments'))
+        highlight_cache = HighlightCache(os.path.join(opts.cache_dir, 'examples'))
+
+    compile_commands = None
+
+    if opts.compile_commands:
+        try:
+            compile_commands = CompileCommands(opts.compile_commands)
+        except CompilationDatabaseError as e:
+            sys.stderr.write("Could not load the compile commands in `{}`: {}\n".format(opts.compile_commands, e))
+            sys.exit(1)
+    elif opts.only_compile_commands:
+        sys.stderr.write("The --only-compile-commands option requires --compile-commands\n")
+        sys.exit(1)
+
+    def create_tree() -> Tree:
+        return tree.Tree(sources(), ''.join(cxxflags), jobs=opts.jobs, ast_cache=ast_cache,
+                         manifest=manifest, compile_commands=compile_commands,
+                         only_compile_commands=opts.only_compile_commands, fast_parse=opts.fast_parse,
+                         include_cache=opts.include_cache, refresh_include_cache=opts.refresh_include_cache,
+                         index=None if daemon is None else daemon.index,
+                         libclang_comments=opts.libclang_comments, comments_cache=comments_cache,
+                         highlight_cache=highlight_cache)
+
+    def generate(t: Tree):
+        if opts.merge:
+            t.merge(opts.merge_filter, opts.merge)
+
+        t.cross_ref()
+
+        run_generate(t, opts)
+
+        if manifest is not None:
+            manifest.save()
+            manifest.restart()
+
+    if daemon is not None:
+        daemon.update(args, create_tree, generate, opts.merge, lambda: list(sources()))
+        return
+
+    if opts.watch:
+        from Pydoc.watch import Watcher
+
+        Watcher(create_tree, generate, opts.merge, opts.watch_interval, lambda: list(sources())).run()
+        return
+
+    t = create_tree()
+
+    if opts.load_tree:
+        t.load(opts.load_tree)
+    else:
+        t.process()
 
-    tree.cross_ref()
+    if opts.save_tree:
+        t.save(opts.save_tree)
 
-    run_generate(tree, opts)
+    generate(t)
 
 # vi:ts=4:et
@@ -11,8 +11,11 @@
 # this program; if not, write to the Free Software Foundation, Inc., 51
 # Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 
+import functools
 import re
 
+from Pydoc.util.location import Location
+
 
 class Comment(object):
     class Example(str):
@@ -22,6 +25,10 @@ class Comment(object):
 
             return str.__new__(self, s)
 
+        def __getnewargs__(self):
+            # The prefix has already been stripped
+            return str(self), False
+
         @staticmethod
         def _strip_prefix(s):
             if s.startswith('    '):
@@ -68,6 +75,9 @@ class Comment(object):
             ret.orig = s
             return ret
 
+        def __getnewargs__(self):
+            return self.orig,
+
     redocref = re.compile('(?P<isregex>[$]?)<(?:\\[(?P<refname>[^\\]]*)\\])?(?P<ref>operator(?:>>|>|>=)|[^>\n]+)>')
     redoccode = re.compile('^    \\[code\\]\n(?P<code>(?:(?:    .*|)\n)*)', re.M)
     redocmcode = re.compile('(^ *(`{3,}|~{3,}).*?\\2)', re.M | re.S)
@@ -95,6 +105,13 @@ class Comment(object):
 
         self.__dict__[name] = val
 
+    def detach(self):
+        """
+        Replace the location of the comment with a plain copy, which does not
+        keep the translation unit alive.
+        """
+        self.__dict__['location'] = Location.from_location(self.location)
+
     def __nonzero__(self):
         return (bool(self.brief) and not (self.brief == u'*documentation missing...*')) or (
                     bool(self.doc) and not (self.doc == u'*documentation missing...*'))
@@ -118,6 +135,15 @@ class Comment(object):
 
         return ret
 
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def compile_ref(ref):
+        """
+        The regular expressions of the references, compiled once (the same
+        ones are usually repeated across the comments).
+        """
+        return re.compile(ref)
+
     def redoc_split(self, doc):
         ret = []
 
@@ -143,7 +169,7 @@ class Comment(object):
                         refname = None
 
                     if len(m.group('isregex')) > 0:
-                        ref = re.compile(ref)
+                        ref = Comment.compile_ref(ref)
 
                     ret.append((prefix, ref, refname))
 
@@ -1,30 +1,60 @@
 import os
-import re
 import sys
 
 from Clang.objects.translation_unit import TranslationUnit
 from Clang.utility.token_kind import TokenKind
+from Pydoc.comments import scanner
 from Pydoc.comments.comment import Comment
 from Pydoc.comments.range_map import RangeMap
 from Pydoc.comments.sorted import Sorted
+from Pydoc.util.location import Location
 
 
 class CommentsDatabase:
-    cldoc_instrre = re.compile('^Pydoc:([a-zA-Z_-]+)(\(([^\)]*)\))?')
+    cldoc_instrre = scanner.instruction_re
 
-    def __init__(self, filename: str, tu: TranslationUnit):
+    def __init__(self, filename: str, tu: TranslationUnit, tokens: bool = False, instructions_only: bool = False):
+        """
+        :param tokens: Extract the comments from the tokens of the translation
+         unit instead of scanning the file, slower but gives the same result.
+        :param instructions_only: Only extract the Pydoc instructions (the
+         categories), the comments of the nodes are given by libclang.
+        """
         self.filename: str = filename
 
         self.categories: RangeMap = RangeMap()
         self.comments: Sorted = Sorted(key=lambda x: x.location.offset)
+        # Extracted comments not yet in comments, they are inserted at once
+        self.pending = []
 
-        self.extract(filename, tu)
+        if tokens:
+            self.extract_tokens(filename, tu)
+        else:
+            self.extract(filename, instructions_only)
 
-    def extract(self, filename: str, tu: TranslationUnit):
+    def extract(self, filename: str, instructions_only: bool = False):
         """
-        extract extracts comments from a translation unit for a given file by
-        iterating over all the tokens in the TU, locating the COMMENT tokens and
-        finding out to which cursors the comments semantically belong.
+        extract extracts the comments of a file by scanning it, see
+        scanner.scan.
+        """
+        for token, s in scanner.scan(filename, instructions_only):
+            self.extract_one(token, s)
+
+        self.flush()
+
+    def flush(self):
+        """
+        Insert the comments extracted so far in the sorted comments.
+        """
+        self.comments.insert_all(self.pending)
+        self.pending = []
+
+    def extract_tokens(self, filename: str, tu: TranslationUnit):
+        """
+        extract_tokens extracts comments from a translation unit for a given
+        file by iterating over all the tokens in the TU, locating the COMMENT
+        tokens and finding out to which cursors the comments semantically
+        belong.
         """
         # The variable st_size is: Size of the file in bytes, if it is a
         # regular file or a symbolic link. The size of a symbolic link is the
@@ -37,6 +67,8 @@ class CommentsDatabase:
             except StopIteration:
                 break
 
+        self.flush()
+
     def parse_cldoc_instruction(self, token, s):
         m = CommentsDatabase.cldoc_instrre.match(s)
 
@@ -116,7 +148,7 @@ class CommentsDatabase:
             return
 
         comment = Comment(s, token.location)
-        self.comments.insert(comment)
+        self.pending.append(comment)
 
     def __extract_loop(self, iter):
         token = next(iter)
@@ -154,43 +186,49 @@ class CommentsDatabase:
 
     @staticmethod
     def __clean_comment_at(token):
-        prelen = token.extent.start.column - 1
-        comment = token.spelling.strip()
+        return scanner.clean_comment(token.spelling, token.extent.start.column - 1)
 
-        # If is a line comment
-        if comment.startswith('//'):
-            if len(comment) > 2 and comment[2] == '-':
-                return None
-
-            return comment[2:].strip()
-        # If is a block comment
-        elif comment.startswith('/*') and comment.endswith('*/'):
-            if comment[2] == '-':
-                return None
-
-            # The line: comment[2:-2] remove the '/*' of begin and the '*/' of end.
-            lines = comment[2:-2].splitlines()
-
-            if len(lines) == 1 and len(lines[0]) > 0 and lines[0][0] == ' ':
-                return lines[0][1:].rstrip()
+    def detach(self):
+        """
+        Replace the locations of the extracted comments with plain copies,
+        so the database no longer keeps the translation unit alive.
+        """
+        for comment in self.comments:
+            comment.detach()
 
-            retl = []
+    def __getstate__(self):
+        """
+        The extracted comments refer to locations of the translation unit,
+        store plain copies instead so the database can be pickled (e.g. for
+        sending it back from a worker process).
+        """
+        return {
+            'filename': self.filename,
+            'comments': [(c.text, Location.from_location(c.location)) for c in self.comments],
+            'categories': [(item.obj, item.start, item.end) for item in self.categories],
+        }
 
-            for line in lines:
-                if prelen == 0 or line[0:prelen].isspace():
-                    line = line[prelen:].rstrip()
+    @staticmethod
+    def from_state(state) -> 'CommentsDatabase':
+        """
+        :param state: The state given by __getstate__.
+        :return: The database with the given comments and categories.
+        """
+        db = CommentsDatabase.__new__(CommentsDatabase)
+        db.__setstate__(state)
 
-                    if line.startswith(' *') or line.startswith('  '):
-                        line = line[2:]
+        return db
 
-                        if len(line) > 0 and line[0] == ' ':
-                            line = line[1:]
+    def __setstate__(self, state):
+        self.filename = state['filename']
 
-                retl.append(line)
+        self.categories = RangeMap()
+        self.comments = Sorted(key=lambda x: x.location.offset)
+        self.pending = []
 
-            return "\n".join(retl)
-        else:
-            return comment
+        self.comments.insert_all(Comment(text, location) for text, location in state['comments'])
+        self.categories.insert_all((RangeMap.Item(obj=obj, start=start, end=end)
+                                    for obj, start, end in state['categories']), right=True)
 
     def __len__(self) -> int:
         """
@@ -1,24 +1,126 @@
-from pyparsing import *
+"""
+Parser of the documentation comments, which are made of:
 
+    brief (the first line)
+    @name description   (parameters before the body, any number)
+    body (after blank lines, up to a line starting with @)
+    @name description   (parameters after the body, e.g. @return)
 
-class Parser:
-    ParserElement.setDefaultWhitespaceChars(' \t\r')
+The description of a parameter continues on the following lines up to an
+empty line or a line starting with @. The results are memoised by comment
+text, the same comments are parsed again for overrides, templates and
+merged documentation.
+"""
+import functools
+import re
+
+_identifier = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_white = re.compile(r'[ \t\r\n]+')
+_blank = re.compile(r'[ \t\r]*')
+
+
+class Param(object):
+    def __init__(self, name: str, description: str):
+        self.name: str = name
+        self.description: str = description
+
+    def __repr__(self) -> str:
+        return '<Param {}: {!r}>'.format(self.name, self.description)
+
+
+class Doc(object):
+    def __init__(self, brief: str, preparam, body: str, postparam):
+        self.brief: str = brief
+        self.preparam = preparam
+        self.body: str = body
+        self.postparam = postparam
+
+
+def _line_end(s: str, pos: int) -> int:
+    end = s.find('\n', pos)
+    return len(s) if end == -1 else end
+
+
+def _param(s: str, pos: int):
+    """
+    :return: The parameter starting at pos (after blanks) and the position
+     after it, or None if there is none.
+    """
+    pos = _blank.match(s, pos).end()
+
+    if not s.startswith('@', pos):
+        return None
+
+    name = _identifier.match(s, _blank.match(s, pos + 1).end())
+
+    if name is None:
+        return None
+
+    white = _white.match(s, name.end())
 
-    identifier = Word(alphas + '_', alphanums + '_')
+    if white is None:
+        return None
 
-    brief = restOfLine.setResultsName('brief') + lineEnd
+    start = white.end()
+    end = _line_end(s, start)
 
-    paramdesc = restOfLine + ZeroOrMore(lineEnd + ~('@' | lineEnd) + Regex('[^\n]+')) + lineEnd.suppress()
-    param = '@' + identifier.setResultsName('name') + White() + Combine(paramdesc).setResultsName('description')
+    # Continued on the following lines which are not empty and do not start
+    # with a @
+    while end + 1 < len(s) and s[end + 1] != '\n' and s[end + 1] != '@':
+        end = _line_end(s, end + 1)
 
-    preparams = ZeroOrMore(param.setResultsName('preparam', listAllMatches=True))
-    postparams = ZeroOrMore(param.setResultsName('postparam', listAllMatches=True))
+    return Param(name.group(), s[start:end]), end + 1
 
-    bodyline = NotAny('@') + (lineEnd | (Regex('[^\n]+') + lineEnd))
-    body = ZeroOrMore(lineEnd) + Combine(ZeroOrMore(bodyline)).setResultsName('body')
 
-    doc = brief + preparams + body + postparams
+def _params(s: str, pos: int):
+    params = []
 
+    while True:
+        found = _param(s, pos)
+
+        if found is None:
+            return tuple(params), pos
+
+        param, pos = found
+        params.append(param)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse(s: str) -> Doc:
+    # The brief is the first line
+    s = s.expandtabs()
+    end = _line_end(s, 0)
+    brief = s[:end]
+    pos = end + 1
+
+    preparam, pos = _params(s, pos)
+
+    # Skip blank lines
+    while True:
+        blank = _blank.match(s, pos).end()
+
+        if blank < len(s) and s[blank] == '\n':
+            pos = blank + 1
+        elif blank == len(s) and pos <= len(s):
+            pos = len(s) + 1
+        else:
+            break
+
+    # The body starts after blanks and ends at the first line starting with
+    # a @
+    start = _blank.match(s, pos).end() if pos <= len(s) else len(s)
+    end = start
+
+    while end < len(s) and s[end] != '@':
+        end = _line_end(s, end) + 1
+
+    body = s[start:end]
+    postparam, _ = _params(s, end)
+
+    return Doc(brief, preparam, body, postparam)
+
+
+class Parser:
     @staticmethod
-    def parse(s):
-        return Parser.doc.parseString(s)
+    def parse(s) -> Doc:
+        return _parse(str(s))
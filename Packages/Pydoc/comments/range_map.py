@@ -5,6 +5,11 @@ from Pydoc.comments.sorted import Sorted
 
 
 class RangeMap(Sorted):
+    """
+    Ranges sorted by start, with a segment tree of the maximum end of the
+    ranges (built when looking up after an insertion) for finding the range
+    containing an offset in logarithmic time.
+    """
     Item = Struct.define('Item', obj=None, start=0, end=0)
 
     def __init__(self):
@@ -12,6 +17,12 @@ class RangeMap(Sorted):
 
         self.stack = []
 
+        # Maximum end of the ranges, the leaves start at _leaves, and the
+        # number of ranges it was built for
+        self._ends = []
+        self._leaves = 0
+        self._built = 0
+
     def push(self, obj, start):
         self.stack.append(RangeMap.Item(obj=obj, start=start, end=start))
 
@@ -27,17 +38,55 @@ class RangeMap(Sorted):
 
         self.insert_right(item)
 
+    def _build(self):
+        leaves = 1
+
+        while leaves < len(self):
+            leaves *= 2
+
+        ends = [float('-inf')] * (2 * leaves)
+
+        for idx, item in enumerate(self):
+            ends[leaves + idx] = item.end
+
+        for node in range(leaves - 1, 0, -1):
+            ends[node] = max(ends[2 * node], ends[2 * node + 1])
+
+        self._ends = ends
+        self._leaves = leaves
+        self._built = len(self)
+
+    def _last_ending_after(self, node, lo, hi, limit, i):
+        # The last range before limit, in the subtree of node covering the
+        # ranges lo to hi, that ends at or after i
+        if lo >= limit or self._ends[node] < i:
+            return -1
+
+        if hi - lo == 1:
+            return lo
+
+        mid = (lo + hi) // 2
+        found = self._last_ending_after(2 * node + 1, mid, hi, limit, i)
+
+        if found == -1:
+            found = self._last_ending_after(2 * node, lo, mid, limit, i)
+
+        return found
+
     def find(self, i):
-        # Finds object for which i falls in the range of that object
+        # Finds object for which i falls in the range of that object, the
+        # last one starting before i if there are several
+        if self._built != len(self):
+            self._build()
+
         idx = bisect.bisect_right(self.keys, i)
 
-        # Go back up until falls within end
-        while idx > 0:
-            idx -= 1
+        if idx == 0:
+            return None
 
-            o = self[idx]
+        found = self._last_ending_after(1, 0, self._leaves, idx, i)
 
-            if i <= o.end:
-                return o.obj
+        if found == -1:
+            return None
 
-        return None
+        return self[found].obj
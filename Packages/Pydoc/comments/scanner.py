@@ -0,0 +1,268 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Extraction of the comments of a file without tokenizing it with libclang.
+
+The file is memory mapped and only the comments, the string and character
+literals (which may contain comment delimiters) and the numbers (which may
+contain digit separators) are lexed with a regular expression, everything else
+is skipped by the regular expression engine. The comments are grouped the same
+way as when iterating over the libclang tokens: strictly adjacent comments are
+concatenated and attached to the token that follows them.
+"""
+import mmap
+import re
+from typing import Iterator, Optional, Tuple
+
+from Pydoc.util.Struct import Struct
+from Pydoc.util.location import Location
+
+# A comment that is a Pydoc:<instruction>()
+instruction_re = re.compile(r'^Pydoc:([a-zA-Z_-]+)(\(([^\)]*)\))?')
+
+# The tokens given to the CommentsDatabase, with the attributes of a libclang
+# token that it uses
+Token = Struct.define('Token', location=None, extent=None)
+Extent = Struct.define('Extent', start=None, end=None)
+
+_prefix = rb'(?<![0-9A-Za-z_$])(?:u8|u|U|L)?'
+
+_lexer = re.compile(
+    # Line comments can be continued with a backslash, block comments that
+    # are not terminated end at the end of the file. Like in the libclang
+    # tokens, the line splices right before a comment are part of it, and
+    # the comment markers can be split by line splices (only one for the end
+    # of a block comment)
+    rb'(?P<comment>(?:\\\r?\n)*/(?:\\\r?\n)*(?:/(?:\\\r?\n|[^\r\n])*|\*.*?(?:\*(?:\\\r?\n)?/|\Z)))'
+    rb'|' + _prefix + rb'R"(?P<delimiter>[^()\\ \t\v\f\r\n"]{0,16})\(.*?\)(?P=delimiter)"'
+    # Literals that are not terminated end at the end of the line
+    rb'|' + rb'"(?:\\(?:\r?\n|.)|[^"\\\r\n])*"?'
+    rb"|" + rb"'(?:\\(?:\r?\n|.)|[^'\\\r\n])*'?"
+    # Numbers, the quotes in 1'000 are digit separators
+    rb"|(?<![0-9A-Za-z_$])\.?[0-9](?:[eEpP][+-]|'[0-9A-Za-z_]|[0-9A-Za-z_.])*",
+    re.DOTALL)
+
+# The line splices are only whitespace when followed by whitespace, otherwise
+# they are part of the next token
+_space = re.compile(rb'(?:[ \t\n\r\v\f]|(?:\\\r?\n)+(?=[ \t\n\r\v\f]|\Z))*')
+_splice = re.compile(r'(?:\\\r?\n)*')
+# The line splices in the comment markers
+_opener_splice = re.compile(r'(?<=\A/)(?:\\\r?\n)+(?=[/*])')
+_closer_splice = re.compile(r'(?<=\*)\\\r?\n(?=/\Z)')
+_newline = re.compile(rb'\n')
+
+_bom = b'\xef\xbb\xbf'
+
+
+def clean_comment(spelling: str, prelen: int) -> Optional[str]:
+    """
+    :param spelling: The text of the comment.
+    :param prelen: The column of the comment (starting at 0), the same
+     indentation is removed from its lines.
+    :return: The comment without the comment markers, or None for comments
+     starting with a - (//- and /*-).
+    """
+    # The comment starts at the beginning of the line after its line splices
+    splices = _splice.match(spelling).end()
+
+    if splices > 0:
+        spelling = spelling[splices:]
+        prelen = 0
+
+    comment = _opener_splice.sub('', spelling.strip())
+
+    if comment.startswith('/*'):
+        comment = _closer_splice.sub('', comment)
+
+    # If is a line comment
+    if comment.startswith('//'):
+        if len(comment) > 2 and comment[2] == '-':
+            return None
+
+        return comment[2:].strip()
+    # If is a block comment
+    elif comment.startswith('/*') and comment.endswith('*/'):
+        if comment[2] == '-':
+            return None
+
+        # The line: comment[2:-2] remove the '/*' of begin and the '*/' of end.
+        lines = comment[2:-2].splitlines()
+
+        if len(lines) == 1 and len(lines[0]) > 0 and lines[0][0] == ' ':
+            return lines[0][1:].rstrip()
+
+        retl = []
+
+        for line in lines:
+            if prelen == 0 or line[0:prelen].isspace():
+                line = line[prelen:].rstrip()
+
+                if line.startswith(' *') or line.startswith('  '):
+                    line = line[2:]
+
+                    if len(line) > 0 and line[0] == ' ':
+                        line = line[1:]
+
+            retl.append(line)
+
+        return "\n".join(retl)
+    else:
+        return comment
+
+
+class _Lines(object):
+    """
+    Converts offsets to lines and columns, the offsets must be given in
+    increasing order.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.offset: int = 0
+        self.line: int = 1
+
+    def location(self, filename: str, offset: int) -> Location:
+        self.line += len(_newline.findall(self.data, self.offset, offset))
+        self.offset = offset
+
+        column = offset - (self.data.rfind(b'\n', 0, offset) + 1) + 1
+
+        return Location(filename, self.line, column, offset)
+
+
+def clean_raw_comment(text: str, column: int) -> Optional[str]:
+    """
+    :param text: The raw comment attached to a cursor by libclang, which can
+     be several adjacent comments.
+    :param column: The column of the comment.
+    :return: The comments cleaned and joined like the comments extracted
+     from the file (see scan), or None if there are none.
+    """
+    data = text.encode('utf-8')
+    comments = []
+    prev_end = None
+
+    for m in _lexer.finditer(data):
+        if m.lastgroup != 'comment':
+            continue
+
+        start, end = m.span()
+        linestart = data.rfind(b'\n', 0, start) + 1
+        prelen = start - linestart + (column - 1 if linestart == 0 else 0)
+        line = data.count(b'\n', 0, start)
+
+        cleaned = clean_comment(m.group().decode('utf-8', 'replace'), prelen)
+
+        if cleaned is not None and instruction_re.match(cleaned) is not None:
+            comments = []
+            prev_end = None
+            continue
+
+        if prev_end is not None and prev_end + 1 < line:
+            comments = []
+
+        if cleaned is not None:
+            comments.append(cleaned)
+
+        prev_end = line + data.count(b'\n', start, end)
+
+    if not comments:
+        return None
+
+    return "\n".join(comments)
+
+
+def _scan(filename: str, data, instructions_only: bool) -> Iterator[Tuple[Token, str]]:
+    lines = _Lines(data)
+    size = len(data)
+
+    # The cleaned comments of the current run
+    comments = []
+    # The line on which the previous comment of the run ends, None if not in
+    # a run of comments
+    prev_end = None
+    # The offset of the token following the run
+    following = 0
+
+    def token_at(offset: int) -> Token:
+        location = lines.location(filename, offset)
+        return Token(location=location, extent=Extent(start=location, end=location))
+
+    # Nothing to do when only looking for instructions in a file without any
+    if instructions_only and data.find(b'Pydoc:') == -1:
+        return
+
+    for m in _lexer.finditer(data, len(_bom) if data[:len(_bom)] == _bom else 0):
+        if m.lastgroup != 'comment':
+            continue
+
+        start, end = m.span()
+
+        if prev_end is not None and start != following:
+            # A token ended the run
+            if comments and not instructions_only:
+                yield token_at(following), "\n".join(comments)
+
+            comments = []
+            prev_end = None
+
+        startloc = lines.location(filename, start)
+        spelling = data[start:end].decode('utf-8', 'replace')
+        cleaned = clean_comment(spelling, startloc.column - 1)
+
+        # Process instructions directly, they end the run
+        if cleaned is not None and instruction_re.match(cleaned) is not None:
+            endloc = lines.location(filename, end)
+            yield Token(location=startloc, extent=Extent(start=startloc, end=endloc)), cleaned
+
+            comments = []
+            prev_end = None
+            continue
+
+        # Check adjacency
+        if prev_end is not None and prev_end + 1 < startloc.line:
+            comments = []
+
+        if cleaned is not None:
+            comments.append(cleaned)
+
+        following = _space.match(data, end).end()
+        prev_end = lines.location(filename, end).line
+
+    # Comments at the end of the file do not belong to any token
+    if prev_end is not None and comments and following < size and not instructions_only:
+        yield token_at(following), "\n".join(comments)
+
+
+def scan(filename: str, instructions_only: bool = False) -> Iterator[Tuple[Token, str]]:
+    """
+    :param filename: The file to scan.
+    :param instructions_only: Only give the Pydoc instructions, for when the
+     comments are attached by libclang.
+    :return: The comments of the file, in order, together with the token
+     they are attached to: the token following strictly adjacent comments, or
+     the comment itself for Pydoc instructions.
+    """
+    with open(filename, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can not be mapped
+            return
+
+    try:
+        yield from _scan(filename, data, instructions_only)
+    finally:
+        data.close()
+
+# vi:ts=4:et
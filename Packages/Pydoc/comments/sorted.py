@@ -40,6 +40,27 @@ class Sorted(list):
     def insert_right(self, item):
         return self.insert_bisect(item, bisect.bisect_right)
 
+    def insert_all(self, items, right=False):
+        """
+        Insert all the items, with the same result as inserting them one by
+        one (with insert, or insert_right if right is True) but sorting only
+        once instead of shifting the list for every item.
+        """
+        items = list(items)
+
+        # Inserting on the left puts the last inserted item first among the
+        # items with the same key, the sort is stable.
+        if right:
+            combined = list(self) + items
+        else:
+            combined = items[::-1] + list(self)
+
+        decorated = [(self.key(item), item) for item in combined]
+        decorated.sort(key=lambda x: x[0])
+
+        self.keys = [k for k, _ in decorated]
+        self[:] = [item for _, item in decorated]
+
     def bisect(self, item, bi):
         k = self.key(item)
 
@@ -0,0 +1,103 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+import os
+from typing import Dict, Iterable, List, Optional
+
+from Clang.objects.compilation_database import CompilationDatabase
+from Pydoc.logger.consolelogger import ConsoleLogger
+from Pydoc.logger.ilogger import ILogger
+
+# Arguments of the build that have no meaning for parsing.
+_DROPPED_ARGUMENTS = ('-c', '-M', '-MM', '-MD', '-MMD', '-MP', '-MG')
+
+# Arguments of the build that have no meaning for parsing, together with the
+# argument that follows them.
+_DROPPED_ARGUMENTS_WITH_VALUE = ('-o', '-MF', '-MT', '-MQ')
+
+
+def _command_flags(arguments: Iterable[str], directory: str, filename: str) -> List[str]:
+    """
+    Convert the command line of a compile command into the flags used for
+    parsing the file with libclang.
+    :param arguments: The command line, the first argument is the compiler.
+    :param directory: The working directory of the command.
+    :param filename: The absolute path to the compiled file.
+    :return: The arguments without the compiler, the compiled file and the
+     arguments only used for producing the output, preceded by the working
+     directory so relative paths are resolved as in the build.
+    """
+    arguments = list(arguments)[1:]
+    result: List[str] = ['-working-directory', directory]
+    index: int = 0
+
+    while index < len(arguments):
+        argument = arguments[index]
+        index += 1
+
+        if argument in _DROPPED_ARGUMENTS_WITH_VALUE:
+            index += 1
+        elif argument in _DROPPED_ARGUMENTS:
+            continue
+        elif not argument.startswith('-') and \
+                os.path.realpath(os.path.join(directory, argument)) == filename:
+            continue
+        else:
+            result.append(argument)
+
+    return result
+
+
+class CompileCommands:
+    """
+    Flags of every file of a compilation database (compile_commands.json).
+    """
+
+    def __init__(self, directory: str):
+        """
+        :param directory: The directory that contains compile_commands.json.
+        :raise CompilationDatabaseError: If the database can not be loaded.
+        """
+        self.logger: ILogger = ConsoleLogger()
+        # Map from the absolute path of a file to its flags, when a file is
+        # built several times the first command is used.
+        self.__flags: Dict[str, List[str]] = {}
+
+        database = CompilationDatabase.fromDirectory(directory)
+        commands = database.getAllCompileCommands()
+
+        for command in commands or []:
+            filename = os.path.realpath(os.path.join(command.directory, command.filename))
+
+            if filename in self.__flags:
+                continue
+
+            self.__flags[filename] = _command_flags(command.arguments, command.directory, filename)
+
+        self.logger.informational("Loaded the compile commands of {} files".format(len(self.__flags)))
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self.__flags
+
+    def __len__(self) -> int:
+        return len(self.__flags)
+
+    def flags(self, filename: str) -> Optional[List[str]]:
+        """
+        :param filename: The absolute path to a file.
+        :return: The flags used for building the file, or None if the file
+         is not in the database.
+        """
+        return self.__flags.get(filename)
+
+# vi:ts=4:et
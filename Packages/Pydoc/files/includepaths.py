@@ -11,9 +11,9 @@
 # this program; if not, write to the Free Software Foundation, Inc., 51
 # Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 
-import os, subprocess, sys
+import json, os, shutil, subprocess, sys, tempfile
 
-from typing import List
+from typing import Dict, List, Optional
 
 from Pydoc.logger.consolelogger import ConsoleLogger
 from Pydoc.logger.ilogger import ILogger
@@ -51,15 +51,77 @@ def _add_prefix_of_inclusion(paths_of_inclusion: List[str]) -> List[str]:
     return ['-I' + path for path in paths_of_inclusion]
 
 
-def flags(f: str) -> List[str]:
+def default_cache_file() -> str:
+    """
+    :return: The file where the include paths of the system are cached by
+     default, inside $XDG_CACHE_HOME (or ~/.cache).
+    """
+    directory = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(directory, 'pydoc', 'includepaths.json')
+
+
+def _cache_key(include_paths: str) -> Optional[str]:
+    """
+    The include paths of the system depend on the clang++ used and on the
+    include paths given, the clang++ is identified by its real path (which
+    for versioned installs contains the version), its modification time and
+    its size, so an upgrade invalidates the cache without running it.
+    :param include_paths: The include paths given, separated by a space.
+    :return: The key of the include paths in the cache, or None if clang++
+     can not be found.
+    """
+    compiler = shutil.which('clang++')
+
+    if compiler is None:
+        return None
+
+    compiler = os.path.realpath(compiler)
+
+    try:
+        stat = os.stat(compiler)
+    except OSError:
+        return None
+
+    return '\0'.join([compiler, str(stat.st_mtime_ns), str(stat.st_size), include_paths])
+
+
+def _read_cache(cache_file: str) -> Dict[str, List[str]]:
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    return cache if isinstance(cache, dict) else {}
+
+
+def _write_cache(cache_file: str, cache: Dict[str, List[str]]) -> None:
+    logger: ILogger = ConsoleLogger()
+
+    try:
+        directory = os.path.dirname(cache_file) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+
+        os.replace(tmp, cache_file)
+    except OSError as e:
+        logger.warning("Could not write the include paths cache {}: {}".format(cache_file, e))
+
+
+def _search_paths(f: str) -> List[str]:
+    """
+    Run clang++ for obtaining its include search list.
+    :param f: The include paths given, separated by a space.
+    :return: The paths in the search list.
+    """
     logger: ILogger = ConsoleLogger()
-    logger.informational("Entering the flag definition")
-    logger.informational("The flags defined has been: {}".format(f))
     logger.informational("Opening the devnull device ({})".format(os.devnull))
     devnull = open(os.devnull)
 
-    f = _extract_include_paths(f)
-
     command: List[str] = ['clang++', '-E', '-xc++'] + f.split(' ') + ['-v', '-']
     logger.informational("The command to execute is: {}".format(command))
 
@@ -100,6 +162,39 @@ def flags(f: str) -> List[str]:
                 p = p[:-len(suffix)]
 
             paths.append(p)
-    return _add_prefix_of_inclusion([path.decode('utf-8') for path in paths])
+    return [path.decode('utf-8') for path in paths]
+
+
+def flags(f: str, cache_file: Optional[str] = None, refresh: bool = False) -> List[str]:
+    """
+    :param f: The compilation flags, only the include paths are used.
+    :param cache_file: The file where the search list of clang++ is cached
+     between runs, by default default_cache_file().
+    :param refresh: Run clang++ even if the search list is cached.
+    :return: The search list of clang++ for the include paths, as flags.
+    """
+    logger: ILogger = ConsoleLogger()
+    logger.informational("Entering the flag definition")
+    logger.informational("The flags defined has been: {}".format(f))
+
+    f = _extract_include_paths(f)
+
+    if cache_file is None:
+        cache_file = default_cache_file()
+
+    key = _cache_key(f)
+    cache = {} if key is None else _read_cache(cache_file)
+
+    if not refresh and key in cache:
+        logger.informational("Using the include paths cached in {}".format(cache_file))
+        return _add_prefix_of_inclusion(cache[key])
+
+    paths = _search_paths(f)
+
+    if key is not None:
+        cache[key] = paths
+        _write_cache(cache_file, cache)
+
+    return _add_prefix_of_inclusion(paths)
 
 # vi:ts=4:et
@@ -1,5 +1,5 @@
 import os, glob
-from typing import List
+from typing import Dict, List, Set
 
 
 class ProviderSource:
@@ -22,6 +22,11 @@ class ProviderSource:
         :param directory: A glob object or directory, default to empty string.
         """
         self.__sources: List[str] = []
+        # Index of the stored files, for membership tests without iterating
+        # over the list.
+        self.__index: Set[str] = set()
+        # Memo of the real path of the paths tested for membership.
+        self.__realpaths: Dict[str, str] = {}
         self.provider_sources(directory)
 
     def __iter__(self):
@@ -30,6 +35,24 @@ class ProviderSource:
         """
         return self.__sources.__iter__()
 
+    def __contains__(self, path) -> bool:
+        """
+        :param path: The path to a file, it does not need to be normalized.
+        :return: True if the file is stored.
+        """
+        path = str(path)
+
+        if path in self.__index:
+            return True
+
+        return self.__realpath(path) in self.__index
+
+    def __realpath(self, path: str) -> str:
+        if not path in self.__realpaths:
+            self.__realpaths[path] = os.path.realpath(path)
+
+        return self.__realpaths[path]
+
     def __len__(self) -> int:
         """
         Assert: The number always will be 0 or greater to 0.
@@ -45,7 +68,11 @@ class ProviderSource:
         """
         for path in glob.iglob(directory, recursive=True):
             if path.endswith(tuple(self.TYPE_EXTENSION)):
-                self.__sources.append(os.path.realpath(path))
+                self.__add(os.path.realpath(path))
+
+    def __add(self, path: str) -> None:
+        self.__sources.append(path)
+        self.__index.add(path)
 
     def sort_first_by_sources(self) -> None:
         """
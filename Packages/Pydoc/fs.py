@@ -12,7 +12,7 @@
 # Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 from __future__ import absolute_import
 
-import os, tempfile, shutil, random
+import filecmp, os, tempfile, shutil, random
 
 try:
     from StringIO import StringIO
@@ -25,6 +25,41 @@ class System:
     def open(*args):
         return open(*args)
 
+    @staticmethod
+    def write_if_changed(path, content):
+        """
+        Write the content to the file unless it already has it, the file is
+        replaced atomically. Returns True if the file was written.
+        """
+        try:
+            with open(path) as f:
+                if f.read() == content:
+                    return False
+        except (OSError, UnicodeDecodeError):
+            pass
+
+        tmp = path + '.tmp'
+
+        with open(tmp, 'w') as f:
+            f.write(content)
+
+        os.replace(tmp, path)
+        return True
+
+    @staticmethod
+    def replace_if_changed(tmp, path):
+        """
+        Replace the file by the temporary file unless they have the same
+        content, in which case the temporary file is removed. Returns True if
+        the file was replaced.
+        """
+        if os.path.exists(path) and filecmp.cmp(tmp, path, shallow=False):
+            os.unlink(tmp)
+            return False
+
+        os.replace(tmp, path)
+        return True
+
     @staticmethod
     def makedirs(*args):
         return os.makedirs(*args)
@@ -86,6 +121,25 @@ class Virtual:
 
             return ret
 
+    @staticmethod
+    def write_if_changed(path, content):
+        if not os.path.isabs(path):
+            path = os.path.join(os.getcwd(), path)
+
+        if path in Virtual.files and Virtual.files[path].value == content:
+            return False
+
+        Virtual.files[path] = Virtual.NeverCloseIO(content)
+        return True
+
+    @staticmethod
+    def replace_if_changed(tmp, path):
+        with open(tmp) as f:
+            content = f.read()
+
+        os.unlink(tmp)
+        return Virtual.write_if_changed(path, content)
+
     @staticmethod
     def makedirs(*args):
         pass
@@ -0,0 +1,83 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Dispatch of the node types to the handlers of a generator.
+
+The handler of a node for fn (e.g. to_xml) is looked up in the class of the
+node and then in its bases, breadth first, stopping at a given base class
+(Nodes.Node for the XML generator). In each class, a handler registered for
+the class comes before the method of the generator named after it (e.g.
+class_to_xml for Nodes.Class). The lookup is done once per node class, the
+result being kept in a table.
+"""
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+
+class Dispatch(object):
+    """
+    Table of the handlers of the node classes. A handler is called with the
+    generator, the node and the element being generated.
+    """
+
+    def __init__(self, stop: type):
+        self.stop: type = stop
+        # The handlers registered by (node class, fn)
+        self.registered: Dict[Tuple[type, str], Callable] = {}
+        # The handlers found by (generator class, node class, fn), None when
+        # there is none
+        self._table: Dict[Tuple[type, type, str], Optional[Callable]] = {}
+
+    def register(self, node_class: type, fn: str, handler: Callable):
+        """
+        Registers the handler of fn for the nodes of node_class, and of its
+        subclasses that have no handler of their own.
+        """
+        self.registered[(node_class, fn)] = handler
+        self._table.clear()
+
+    def _find(self, generator_class: type, node_class: type, fn: str) -> Optional[Callable]:
+        classes = deque([node_class])
+
+        while classes:
+            cls = classes.popleft()
+
+            if cls is self.stop:
+                continue
+
+            handler = self.registered.get((cls, fn))
+
+            if handler is None:
+                handler = getattr(generator_class, cls.__name__.lower() + '_' + fn, None)
+
+            if handler is not None:
+                return handler
+
+            classes.extend(cls.__bases__)
+
+        return None
+
+    def lookup(self, generator_class: type, node_class: type, fn: str) -> Optional[Callable]:
+        """
+        :return: The handler of fn for the nodes of node_class, or None if
+         there is none.
+        """
+        key = (generator_class, node_class, fn)
+
+        try:
+            return self._table[key]
+        except KeyError:
+            handler = self._table[key] = self._find(generator_class, node_class, fn)
+            return handler
+
+# vi:ts=4:et
@@ -49,8 +49,7 @@ class Html(Generator):
             templ = '<meta type="custom-css" />'
             content = content.replace(templ, " ".join(csstags))
 
-            with fs.fs.open(outfile, 'w') as o:
-                o.write(content)
+            fs.fs.write_if_changed(outfile, content)
 
         if "CLDOC_DEV" in os.environ:
             fs.fs.rmtree(os.path.join(output, "javascript"), True)
@@ -76,7 +75,7 @@ class Html(Generator):
 
         outfile = os.path.join(output, 'search.json')
 
-        with fs.fs.open(outfile, 'w') as f:
-            f.write(json.dumps({'records': records, 'suffixes': search.db}))
+        if not fs.fs.write_if_changed(outfile, json.dumps({'records': records, 'suffixes': search.db})):
+            print('Unchanged `{0}\''.format(outfile))
 
 # vi:ts=4:et
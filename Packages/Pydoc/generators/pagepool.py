@@ -0,0 +1,86 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Rendering of the XML pages in worker processes.
+
+The workers are forked once the index has been generated, so they share the
+processed tree and the generator (which can not be pickled) with the parent.
+Each worker renders and writes whole pages; what the parent needs to know
+about a page (its digest and the nodes whose refid it computed, for the
+search) is sent back as plain python data and applied by
+the parent in the order of the pages, so the manifest and the search are the
+same as when generating serially.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+# State of a worker process, inherited from the parent when forking.
+_generator = None
+_pages = []
+
+
+class PageResult(object):
+    """
+    Picklable outcome of rendering one page in a worker.
+    """
+
+    def __init__(self, filename: str):
+        self.filename: str = filename
+        self.digest: Optional[str] = None
+        # The page has the same contents as in the previous run and was not
+        # written again
+        self.unchanged: bool = False
+        # The ids of the nodes whose refid was computed
+        self.refids: List[int] = []
+
+
+def _render(job: int) -> PageResult:
+    return _generator.render_page(_pages[job])
+
+
+def available() -> bool:
+    """
+    :return: Whether the pages can be rendered in worker processes, the
+     workers must be forked.
+    """
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+class PagePool(object):
+    """
+    Renders the pages of the nodes with the generator in jobs processes,
+    iterating gives the results in the order of the nodes.
+    """
+
+    def __init__(self, generator, nodes: List, jobs: int):
+        self.generator = generator
+        self.nodes: List = list(nodes)
+        self.jobs: int = jobs
+
+    def __iter__(self):
+        global _generator, _pages
+
+        context = multiprocessing.get_context('fork')
+        chunksize = max(1, len(self.nodes) // (self.jobs * 8))
+
+        _generator, _pages = self.generator, self.nodes
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.jobs, mp_context=context) as executor:
+                for result in executor.map(_render, range(len(self.nodes)), chunksize=chunksize):
+                    yield result
+        finally:
+            _generator, _pages = None, []
+
+# vi:ts=4:et
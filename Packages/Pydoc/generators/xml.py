@@ -12,25 +12,116 @@
 # Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 from __future__ import absolute_import
 
+import hashlib
+import io
 import os
-import sys
+from typing import Callable, Optional
 from xml.etree import ElementTree
 from xml.etree.ElementTree import Element
 
 import Nodes
 from Clang.kinds.access_specifier import AccessSpecifier
 from Pydoc import example
+from Pydoc import fs
 from Pydoc import utf8
+from Pydoc.generators import pagepool
+from Pydoc.generators.dispatch import Dispatch
 from Pydoc.generators.generator import Generator
+from Pydoc.generators.xmlwriter import XmlWriter
+
+
+class XmlPage(object):
+    """
+    A page being written. Pages are kept in memory until written, except
+    the streamed ones (the index) that are written to a temporary file next
+    to their path while they are generated.
+    """
+
+    XMLNS = 'http://jessevdk.github.com/cldoc/1.0'
+
+    def __init__(self, filename: str, path: str, stream: bool = False):
+        self.filename: str = filename
+        self.path: str = path
+        self.stream: bool = stream
+        self._digest = hashlib.sha256()
+
+        if stream:
+            self._out = open(self.temporary, 'w')
+        else:
+            self._out = io.StringIO()
+
+        self.writer: XmlWriter = XmlWriter(self.write, xmlns=XmlPage.XMLNS)
+
+    @property
+    def temporary(self) -> str:
+        return self.path + '.tmp'
+
+    def write(self, text: str):
+        self._out.write(text)
+
+        if self.stream:
+            self._digest.update(text.encode('utf-8'))
+
+    def finish(self) -> str:
+        """
+        Ends the page.
+        :return: The sha256 of its content.
+        """
+        self.writer.close()
+        self.write('\n')
+
+        if self.stream:
+            self._out.close()
+        else:
+            self._digest.update(self._out.getvalue().encode('utf-8'))
+
+        return self._digest.hexdigest()
+
+    def commit(self) -> bool:
+        """
+        Writes the finished page to its path, unless the file already has
+        the same content.
+        :return: True if the file was written.
+        """
+        if self.stream:
+            return fs.fs.replace_if_changed(self.temporary, self.path)
+        else:
+            return fs.fs.write_if_changed(self.path, self._out.getvalue())
+
+    def flush(self):
+        self._out.flush()
+
+    def discard(self):
+        """
+        Drops the page, also when it was not finished.
+        """
+        self._out.close()
+
+        if self.stream and os.path.exists(self.temporary):
+            os.unlink(self.temporary)
 
 
 class Xml(Generator):
+    # The handlers of the node types, shared by the generators
+    dispatch: Dispatch = Dispatch(Nodes.Node)
+
     def __init__(self, tree=None, opts=None):
         super().__init__(tree, opts)
-        self.index: Element = ElementTree.Element('index')
+        # The index page, written while the nodes are generated
+        self.index: Optional[XmlPage] = None
+        # The nodes whose reference elements are open in the index
+        self.index_nodes = []
         # Used for determine which files has been written in the filesystem
         self.written: dict[str, bool] = {}
-        self.index_map = {self.tree.root: self.index}
+        # Number of pages that did not change since the previous run (and
+        # were not written)
+        self.unchanged: int = 0
+        # Number of processes rendering the pages, see PagePool
+        self.jobs: int = getattr(opts, 'jobs', 1) if pagepool.available() else 1
+        # The nodes whose pages are rendered by the PagePool
+        self.pages = []
+        # Set while rendering a page in a worker
+        self.collect: Optional[pagepool.PageResult] = None
 
     def generate(self, out_directory: str):
         if not out_directory:
@@ -46,21 +137,56 @@ class Xml(Generator):
         ElementTree.register_namespace('gobject', 'http://jessevdk.github.com/cldoc/gobject/1.0')
         ElementTree.register_namespace('Pydoc', 'http://jessevdk.github.com/cldoc/1.0')
 
-        cm = self.tree.root.comment
+        self.outdir = out_directory
+        self.index = self.open_page('index.xml', stream=True)
+
+        try:
+            self.index.writer.start(ElementTree.Element('index'))
+            self.index_nodes = [self.tree.root]
+
+            cm = self.tree.root.comment
+
+            if cm:
+                if cm.brief:
+                    self.index.writer.element(self.doc_to_xml(self.tree.root, cm.brief, 'brief'))
+
+                if cm.doc:
+                    self.index.writer.element(self.doc_to_xml(self.tree.root, cm.doc))
+
+            Generator.generate(self, out_directory)
 
-        if cm:
-            if cm.brief:
-                self.index.append(self.doc_to_xml(self.tree.root, cm.brief, 'brief'))
+            self.index_parent(self.tree.root)
 
-            if cm.doc:
-                self.index.append(self.doc_to_xml(self.tree.root, cm.doc))
+            if self.pages:
+                self.render_pages()
 
-        Generator.generate(self, out_directory)
+            if self.options.report:
+                self.add_report()
 
-        if self.options.report:
-            self.add_report()
+            self.close_page(self.index)
+        except:
+            self.index.discard()
+            raise
 
-        self.write_xml(self.index, 'index.xml')
+        manifest = self.tree.manifest
+
+        if manifest is not None:
+            self.remove_stale_pages(manifest.stale_pages())
+
+        self._logger.informational("Generated {} XML pages: {} changed, {} unchanged".format(
+            len(self.written), len(self.written) - self.unchanged, self.unchanged))
+
+    def remove_stale_pages(self, pages):
+        """
+        Remove the pages written by the previous run for symbols that no
+        longer exist.
+        """
+        for page in pages:
+            path = os.path.join(self.outdir, page)
+
+            if os.path.exists(path):
+                self._logger.informational("Removing XML: {}".format(page))
+                os.unlink(path)
 
     def add_report(self):
         from Pydoc.generators.report import Report
@@ -76,48 +202,43 @@ class Xml(Generator):
         elem.set('name', 'Documentation generator')
         elem.set('ref', reportname)
 
-        self.index.append(elem)
+        self.index.writer.element(elem)
 
         self.write_xml(page, reportname + '.xml')
 
-    def indent(self, elem, level=0):
-        i = "\n" + "  " * level
+    def open_page(self, filename_out: str, stream: bool = False) -> XmlPage:
+        self.written[filename_out] = True
+        self._logger.informational("Generating XML: {}".format(filename_out))
 
-        if elem.tag == 'doc':
-            return
+        return XmlPage(filename_out, os.path.join(self.outdir, filename_out), stream)
 
-        if len(elem):
-            if not elem.text or not elem.text.strip():
-                elem.text = i + "  "
+    def close_page(self, page: XmlPage):
+        digest = page.finish()
+        manifest = self.tree.manifest
 
-            for e in elem:
-                self.indent(e, level + 1)
+        if self.collect is not None:
+            self.collect.digest = digest
 
-                if not e.tail or not e.tail.strip():
-                    e.tail = i + "  "
-            if not e.tail or not e.tail.strip():
-                e.tail = i
+        # Leave pages with the same contents as in the previous run untouched,
+        # without reading them when the manifest has their digest
+        if manifest is not None and manifest.record_page(page.filename, digest) and os.path.exists(page.path):
+            page.discard()
+            unchanged = True
         else:
-            if level and (not elem.tail or not elem.tail.strip()):
-                elem.tail = i
+            unchanged = not page.commit()
 
-    def write_xml(self, elem: Element, filename_out: str):
-        self.written[filename_out] = True
-        self._logger.informational("Generating XML: {}".format(filename_out))
+        if unchanged:
+            self._logger.informational("Unchanged XML: {}".format(page.filename))
+            self.unchanged += 1
 
-        elem.attrib['xmlns'] = 'http://jessevdk.github.com/cldoc/1.0'
+            if self.collect is not None:
+                self.collect.unchanged = True
 
-        tree = ElementTree.ElementTree(elem)
-
-        self.indent(tree.getroot())
+    def write_xml(self, elem: Element, filename_out: str):
+        page = self.open_page(filename_out)
+        page.writer.element(elem)
 
-        with open(os.path.join(self.outdir, filename_out), 'w') as file_object:
-            if sys.version_info[0] == 3:
-                tree.write(file_object, encoding='unicode', xml_declaration=True)
-            else:
-                tree.write(file_object, encoding='utf-8', xml_declaration=True)
-            file_object.write('\n')
-        assert file_object.closed
+        self.close_page(page)
 
     def is_page(self, node):
         if node.force_page:
@@ -172,6 +293,10 @@ class Xml(Generator):
 
         if not node is None:
             node._refid = parent.qid + '#' + meid
+
+            if self.collect is not None:
+                self.collect.refids.append(id(node))
+
             return node._refid
         else:
             return None
@@ -472,26 +597,27 @@ class Xml(Generator):
 
         return doce
 
-    def call_type_specific(self, node, elem, fn):
-        clss = [node.__class__]
-
-        while len(clss) > 0:
-            cls = clss[0]
-            clss = clss[1:]
-
-            if cls == Nodes.Node:
-                continue
-
-            nm = cls.__name__.lower() + '_' + fn
+    @classmethod
+    def register(cls, node_class: type, fn: str, handler: Callable):
+        """
+        Registers handler(generator, node, elem) as the fn ('to_xml' or
+        'to_xml_ref') of the nodes of node_class, e.g. for node types that
+        are not part of Nodes. It takes precedence over the method named
+        after node_class.
+        """
+        cls.dispatch.register(node_class, fn, handler)
 
-            if hasattr(self, nm):
-                getattr(self, nm)(node, elem)
-                break
+    def call_type_specific(self, node, elem, fn):
+        handler = self.dispatch.lookup(type(self), type(node), fn)
 
-            if cls != Nodes.Node:
-                clss.extend(cls.__bases__)
+        if handler is not None:
+            handler(self, node, elem)
 
-    def node_to_xml(self, node):
+    def node_to_xml(self, node, out: Optional[XmlWriter] = None):
+        """
+        :param out: When given, the element is written to it, its children
+         being written as they are generated.
+        """
         elem = ElementTree.Element(node.classname)
         props = node.props
 
@@ -507,6 +633,12 @@ class Xml(Generator):
 
         self.call_type_specific(node, elem, 'to_xml')
 
+        if out is None:
+            add = elem.append
+        else:
+            out.start(elem)
+            add = out.element
+
         for child in node.sorted_children():
             if child.access == AccessSpecifier.PRIVATE:
                 continue
@@ -514,11 +646,14 @@ class Xml(Generator):
             self.refid(child)
 
             if self.is_page(child):
-                chelem = self.node_to_xml_ref(child)
+                add(self.node_to_xml_ref(child))
+            elif out is None:
+                add(self.node_to_xml(child))
             else:
-                chelem = self.node_to_xml(child)
+                self.node_to_xml(child, out)
 
-            elem.append(chelem)
+        if out is not None:
+            out.end()
 
         return elem
 
@@ -530,9 +665,60 @@ class Xml(Generator):
 
             element.append(self.node_to_xml(child))
 
+    @staticmethod
+    def page_filename(node) -> str:
+        return node.qid.replace('::', '.') + '.xml'
+
     def generate_page(self, node):
-        elem = self.node_to_xml(node)
-        self.write_xml(elem, node.qid.replace('::', '.') + '.xml')
+        filename = self.page_filename(node)
+        page = self.open_page(filename)
+
+        try:
+            self.node_to_xml(node, page.writer)
+            self.close_page(page)
+        except:
+            page.discard()
+            raise
+
+    def render_page(self, node) -> pagepool.PageResult:
+        """
+        Generates the page of a node in a worker.
+        :return: What the parent needs to know about the page.
+        """
+        self.collect = pagepool.PageResult(self.page_filename(node))
+
+        try:
+            self.generate_page(node)
+            return self.collect
+        finally:
+            self.collect = None
+
+    def render_pages(self):
+        """
+        Generates the pages collected while generating the index, in worker
+        processes.
+        """
+        nodes = {id(node): node for node in self.tree.root.descendants()}
+        manifest = self.tree.manifest
+
+        # The workers inherit the open index
+        self.index.flush()
+
+        for result in pagepool.PagePool(self, self.pages, self.jobs):
+            self.written[result.filename] = True
+
+            if manifest is not None:
+                manifest.record_page(result.filename, result.digest)
+
+            if result.unchanged:
+                self.unchanged += 1
+
+            # The refids are needed by the search
+            for i in result.refids:
+                if i in nodes:
+                    self.refid(nodes[i])
+
+        self.pages = []
 
     def node_to_xml_ref(self, node):
         elem = ElementTree.Element(node.classname)
@@ -551,6 +737,15 @@ class Xml(Generator):
 
         return elem
 
+    def index_parent(self, node):
+        """
+        Closes the elements of the index up to the one of node, the nodes
+        being generated depth first.
+        """
+        while self.index_nodes[-1] is not node:
+            self.index.writer.end()
+            self.index_nodes.pop()
+
     def generate_node(self, node):
         # Ignore private stuff
         if node.access == AccessSpecifier.PRIVATE:
@@ -561,12 +756,17 @@ class Xml(Generator):
         if self.is_page(node):
             elem = self.node_to_xml_ref(node)
 
-            self.index_map[node.parent].append(elem)
-            self.index_map[node] = elem
+            self.index_parent(node.parent)
+            self.index.writer.start(elem)
+            self.index_nodes.append(node)
 
-            self.generate_page(node)
+            if self.jobs > 1:
+                self.pages.append(node)
+            else:
+                self.generate_page(node)
         elif self.is_top(node):
-            self.index.append(self.node_to_xml(node))
+            self.index_parent(node.parent)
+            self.node_to_xml(node, self.index.writer)
 
         if isinstance(node, Nodes.Namespace) or isinstance(node, Nodes.Category):
             # Go deep for namespaces and categories
@@ -0,0 +1,222 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Incremental writer of the XML pages.
+
+The output is the same as serialising a whole ElementTree (with an XML
+declaration) after indenting it: the elements with children have their blank
+text and the blank tails of their children replaced by a newline and two
+spaces per level, except inside the doc elements. Instead of building the
+whole tree, elements are opened (start), written complete (element) and
+closed (end) as they are generated; the tail of a child is only written when
+the next child starts or its parent ends, once it is known whether it is the
+last one.
+"""
+import io
+from typing import Callable, List, Optional
+from xml.etree import ElementTree
+# The escaping of ElementTree, for writing the same bytes
+from xml.etree.ElementTree import Element, _escape_attrib, _escape_cdata
+
+
+def _declaration() -> str:
+    content = io.StringIO()
+    ElementTree.ElementTree(Element('x')).write(content, encoding='unicode', xml_declaration=True)
+
+    return content.getvalue()[:content.getvalue().index('<x')]
+
+
+def _blank(text: Optional[str]) -> bool:
+    return not text or not text.strip()
+
+
+class _Open(object):
+    def __init__(self, elem: Element, level: int, indent: bool):
+        self.elem: Element = elem
+        self.level: int = level
+        # Whether the content of the element is indented
+        self.indent: bool = indent and elem.tag != 'doc'
+        self.children: int = 0
+        # The tail of the last child, written when the next child starts or
+        # when the element ends
+        self.tail: Optional[str] = None
+
+
+class XmlWriter(object):
+    """
+    Writes an XML document with the write function.
+    :param pretty: Indent the elements.
+    :param xmlns: Set as the xmlns attribute of the root element (after its
+     other attributes).
+    """
+
+    def __init__(self, write: Callable[[str], None], pretty: bool = True, xmlns: Optional[str] = None):
+        self._write: Callable[[str], None] = write
+        self.pretty: bool = pretty
+        self.xmlns: Optional[str] = xmlns
+        self._stack: List[_Open] = []
+        self._root: bool = True
+
+        write(_declaration())
+
+    @staticmethod
+    def _newline(level: int) -> str:
+        return '\n' + '  ' * level
+
+    def _start_tag(self, elem: Element):
+        if self._root:
+            self._root = False
+
+            if self.xmlns is not None:
+                elem.set('xmlns', self.xmlns)
+
+        write = self._write
+        write('<' + elem.tag)
+
+        for k, v in elem.items():
+            write(' {}="{}"'.format(k, _escape_attrib(v)))
+
+    def _child(self) -> int:
+        """
+        Writes what comes before a new child of the open element.
+        :return: The level of the child.
+        """
+        if not self._stack:
+            return 0
+
+        top = self._stack[-1]
+
+        if top.children == 0:
+            text = top.elem.text
+
+            if top.indent and _blank(text):
+                text = self._newline(top.level + 1)
+
+            self._write('>')
+
+            if text:
+                self._write(_escape_cdata(text))
+        else:
+            self._tail(top, self._newline(top.level + 1))
+
+        top.children += 1
+
+        return top.level + 1
+
+    def _tail(self, top: _Open, newline: str):
+        tail = top.tail
+
+        if top.indent and _blank(tail):
+            tail = newline
+
+        if tail:
+            self._write(_escape_cdata(tail))
+
+    def _element(self, elem: Element, level: int, indent: bool):
+        write = self._write
+        indent = indent and elem.tag != 'doc'
+        text = elem.text
+        count = len(elem)
+
+        if indent and count and _blank(text):
+            text = self._newline(level + 1)
+
+        if text or count:
+            write('>')
+
+            if text:
+                write(_escape_cdata(text))
+
+            for i, child in enumerate(elem):
+                self._start_tag(child)
+                self._element(child, level + 1, indent)
+
+                tail = child.tail
+
+                if indent and _blank(tail):
+                    tail = self._newline(level + 1 if i < count - 1 else level)
+
+                if tail:
+                    write(_escape_cdata(tail))
+
+            write('</' + elem.tag + '>')
+        else:
+            write(' />')
+
+    def _parent_indent(self) -> bool:
+        return self._stack[-1].indent if self._stack else self.pretty
+
+    def element(self, elem: Element):
+        """
+        Writes a complete element in the open element.
+        """
+        indent = self._parent_indent()
+        level = self._child()
+
+        self._start_tag(elem)
+        self._element(elem, level, indent)
+
+        if self._stack:
+            self._stack[-1].tail = elem.tail
+        elif elem.tail:
+            self._write(_escape_cdata(elem.tail))
+
+    def start(self, elem: Element):
+        """
+        Opens an element, the elements written until the matching end are
+        added to its current children.
+        """
+        indent = self._parent_indent()
+        level = self._child()
+
+        self._start_tag(elem)
+        self._stack.append(_Open(elem, level, indent))
+
+        for child in list(elem):
+            self.element(child)
+
+    def end(self):
+        """
+        Closes the last opened element.
+        """
+        top = self._stack.pop()
+        elem = top.elem
+
+        if top.children:
+            self._tail(top, self._newline(top.level))
+            self._write('</' + elem.tag + '>')
+        elif elem.text:
+            self._write('>' + _escape_cdata(elem.text) + '</' + elem.tag + '>')
+        else:
+            self._write(' />')
+
+        if self._stack:
+            self._stack[-1].tail = elem.tail
+        elif elem.tail:
+            self._write(_escape_cdata(elem.tail))
+
+    @property
+    def depth(self) -> int:
+        """
+        The number of open elements.
+        """
+        return len(self._stack)
+
+    def close(self):
+        """
+        Closes all the open elements.
+        """
+        while self._stack:
+            self.end()
+
+# vi:ts=4:et
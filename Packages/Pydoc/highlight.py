@@ -0,0 +1,186 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Syntax highlighting of the code examples of the comments.
+
+The examples are never written to disk: they are given to libclang as unsaved
+files, all included by a single unsaved main file, so that one translation
+unit is parsed for all of them. A file that is not entered because of a fatal
+error in a preceding one (e.g. an include that is not found) is parsed again
+in the next batch. The cursors of the tokens are obtained with one call to
+clang_annotateTokens per example.
+"""
+import hashlib
+import os
+import tempfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Clang.exceptions.translation_unit import TranslationUnitLoadError
+from Clang.kinds.cursor_kind import CursorKind
+from Clang.objects.index import Index
+from Clang.objects.translation_unit import TranslationUnit
+from Clang.utility.token_kind import TokenKind
+from Pydoc import example
+from Pydoc.cache.highlight_cache import HighlightCache
+
+# A highlighted range of an example: start and end offsets (in bytes) and class
+Highlight = Tuple[int, int, str]
+
+
+def digest(text: str, flags: List[str]) -> str:
+    h = hashlib.sha256()
+    h.update('\0'.join(flags).encode('utf-8'))
+    h.update(b'\0\0')
+    h.update(text.encode('utf-8'))
+
+    return h.hexdigest()
+
+
+def classify(tokens: Iterable[Tuple[TokenKind, CursorKind, str, int, int, Optional[int]]]) -> List[Highlight]:
+    """
+    :param tokens: The tokens of an example as (token kind, cursor kind,
+     spelling, start, end, start of the cursor) tuples, the start of the
+     cursor is only needed for inclusion directives.
+    :return: The highlighted ranges.
+    """
+    hl = []
+    incstart = None
+
+    for kind, cursor_kind, spelling, start, end, cursor_start in tokens:
+        if kind == TokenKind.KEYWORD:
+            hl.append((start, end, 'keyword'))
+            continue
+        elif kind == TokenKind.COMMENT:
+            hl.append((start, end, 'comment'))
+
+        if cursor_kind == CursorKind.PREPROCESSING_DIRECTIVE:
+            hl.append((start, end, 'preprocessor'))
+        elif cursor_kind == CursorKind.INCLUSION_DIRECTIVE and incstart is None:
+            incstart = cursor_start
+        elif incstart is not None and kind == TokenKind.PUNCTUATION and spelling == '>':
+            hl.append((incstart, end, 'preprocessor'))
+            incstart = None
+
+    return hl
+
+
+def to_example(text: str, highlights: List[Highlight]) -> example.Example:
+    data = text.encode('utf-8')
+    ex = example.Example()
+    lastpos = 0
+
+    for start, end, kind in highlights:
+        ex.append(data[lastpos:start].decode('utf-8', 'replace'))
+        ex.append(data[start:end].decode('utf-8', 'replace'), kind)
+
+        lastpos = end
+
+    ex.append(data[lastpos:].decode('utf-8', 'replace'))
+
+    return ex
+
+
+class ExampleHighlighter(object):
+    """
+    Highlights the examples parsed with the flags, the results are kept by
+    digest (in the cache when one is given).
+    """
+
+    def __init__(self, index: Index, flags: List[str], cache: Optional[HighlightCache] = None):
+        self.index: Index = index
+        self.flags: List[str] = flags
+        self.cache: Optional[HighlightCache] = cache
+
+        # The unsaved files do not exist, they only need distinct names
+        self.directory: str = os.path.join(tempfile.gettempdir(), 'pydoc-examples')
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name + '.cc')
+
+    def _tokens(self, tu: TranslationUnit, filename: str, size: int):
+        for token, cursor in tu.get_annotated_tokens(tu.get_extent(filename, (0, size))):
+            extent = token.extent
+
+            kind = cursor.kind
+            cursor_start = cursor.extent.start.offset if kind == CursorKind.INCLUSION_DIRECTIVE else None
+
+            yield token.kind, kind, token.spelling, extent.start.offset, extent.end.offset, cursor_start
+
+    def _parse(self, examples: Dict[str, bytes]) -> Optional[Tuple[Dict[str, List[Highlight]], List[str]]]:
+        """
+        Parses the examples in a single translation unit.
+        :return: The highlighting of the examples that were entered and the
+         digests of the others, or None if the translation unit could not be
+         parsed.
+        """
+        main = self._path('examples')
+        paths = {d: self._path(d) for d in examples}
+
+        includes = ''.join('#include "{}"\n'.format(paths[d]) for d in examples)
+        unsaved = [(main, includes)] + [(paths[d], data) for d, data in examples.items()]
+
+        try:
+            tu = self.index.parse(main, self.flags, unsaved_files=unsaved,
+                                  options=TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD |
+                                  TranslationUnit.PARSE_SKIP_FUNCTION_BODIES)
+        except TranslationUnitLoadError:
+            return None
+
+        highlighted = {}
+        skipped = []
+
+        for d, data in examples.items():
+            if tu.get_file(paths[d]).handle is None:
+                skipped.append(d)
+            else:
+                highlighted[d] = classify(self._tokens(tu, paths[d], len(data)))
+
+        return highlighted, skipped
+
+    def highlight(self, texts: Iterable[str]) -> Dict[str, List[Highlight]]:
+        """
+        :return: Map from the texts to their highlighted ranges.
+        """
+        digests = {text: digest(text, self.flags) for text in texts}
+        highlighted: Dict[str, List[Highlight]] = {}
+        remaining: Dict[str, bytes] = {}
+
+        for text, d in digests.items():
+            hl = self.cache.lookup(d) if self.cache is not None else None
+
+            if hl is None:
+                remaining[d] = text.encode('utf-8')
+            else:
+                highlighted[d] = hl
+
+        while remaining:
+            result = self._parse(remaining)
+
+            if result is None or not result[0]:
+                # Shown without highlighting (and not cached)
+                highlighted.update((d, []) for d in remaining)
+                break
+
+            parsed, skipped = result
+
+            for d, hl in parsed.items():
+                highlighted[d] = hl
+
+                if self.cache is not None:
+                    self.cache.store(d, hl)
+
+            remaining = {d: remaining[d] for d in skipped}
+
+        return {text: highlighted[d] for text, d in digests.items()}
+
+# vi:ts=4:et
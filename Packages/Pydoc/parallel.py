@@ -0,0 +1,195 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Parsing of translation units in worker processes.
+
+Each worker parses one file with libclang, extracts the comments of the file
+and of the headers it includes (each header is extracted by one worker only)
+and saves the AST with TranslationUnit.save (into the AST cache when one is
+used). Everything sent back to the
+parent is plain python data, the parent then loads the AST file, which is
+much cheaper than parsing, and builds the nodes in the original order so
+the result is identical to the serial build.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Set
+
+from Clang.exceptions.translation_unit import TranslationUnitLoadError
+from Clang.objects.index import Index
+from Pydoc import parsing
+from Pydoc.cache.ast_cache import AstCache
+from Pydoc.cache.comments_cache import CommentsCache
+from Pydoc.comments.comments_database import CommentsDatabase
+
+# State of a worker process, set once by _initialize.
+_index: Optional[Index] = None
+_sources = frozenset()
+_claims = None
+_cache: Optional[AstCache] = None
+_instructions_only: bool = False
+_comments_cache: Optional[CommentsCache] = None
+
+
+class ParseResult(object):
+    """
+    Picklable outcome of parsing one file in a worker.
+    """
+
+    def __init__(self, filename: str):
+        self.filename: str = filename
+        self.ast: Optional[str] = None
+        # The file could not be parsed
+        self.error: bool = False
+        # The worker stopped on an invalid Pydoc instruction
+        self.aborted: bool = False
+        self.diagnostics: List = []
+        self.includes: List[str] = []
+        self.commentsdbs: Dict[str, CommentsDatabase] = {}
+
+    @property
+    def fatal(self) -> bool:
+        return parsing.is_fatal(self.diagnostics)
+
+
+def _initialize(sources, claims, cache, instructions_only, comments_cache):
+    global _index, _sources, _claims, _cache, _instructions_only, _comments_cache
+
+    _index = Index.create()
+    _sources = frozenset(sources)
+    _claims = claims
+    _cache = cache
+    _instructions_only = instructions_only
+    _comments_cache = comments_cache
+
+
+def _parse(job: int, filename: str, flags: List[str], options: int, ast: str, lookup: bool) -> ParseResult:
+    result = ParseResult(filename)
+
+    try:
+        parsed = parsing.parse(_index, filename, flags, options, cache=_cache, lookup=lookup)
+    except TranslationUnitLoadError:
+        result.error = True
+        return result
+
+    translation_unit = parsed.translation_unit
+
+    result.diagnostics = parsed.diagnostics
+    result.includes = parsed.includes
+
+    if result.fatal:
+        return result
+
+    try:
+        for extracted in [filename] + result.includes:
+            if extracted in result.commentsdbs or extracted not in _sources:
+                continue
+
+            # Only the first worker to claim a file extracts its comments
+            if _claims.setdefault(extracted, job) != job:
+                continue
+
+            result.commentsdbs[extracted] = parsing.comments(extracted, translation_unit, _comments_cache,
+                                                             _instructions_only)
+    except SystemExit:
+        # Invalid Pydoc instruction, the message has already been written
+        result.aborted = True
+        return result
+
+    if parsed.ast is None:
+        translation_unit.save(ast)
+        result.ast = ast
+    else:
+        result.ast = parsed.ast
+
+    return result
+
+
+class ParsePool(object):
+    """
+    Parses the given files in a pool of worker processes. Iterating over the
+    pool yields the ParseResult of every file, in the order of the files.
+    Files that are not in affected are first looked up in the cache, the
+    comments are extracted from the files in sources (by default the parsed
+    files).
+    """
+
+    def __init__(self, files: List[str], flags: Callable[[str], List[str]], jobs: int,
+                 cache: Optional[AstCache] = None, affected: Optional[Set[str]] = None,
+                 sources: Optional[List[str]] = None, options: Optional[Callable[[str], int]] = None,
+                 instructions_only: bool = False, comments_cache: Optional[CommentsCache] = None):
+        self.files: List[str] = list(files)
+        self.sources: List[str] = self.files if sources is None else list(sources)
+        # Gives the TranslationUnit.PARSE_XXX options of a file
+        self.options: Callable[[str], int] = (lambda f: 0) if options is None else options
+        # Gives the flags used for parsing a file
+        self.flags: Callable[[str], List[str]] = flags
+        self.jobs: int = jobs
+        self.cache: Optional[AstCache] = cache
+        self.affected: Set[str] = set() if affected is None else affected
+        # Only the Pydoc instructions are extracted from the comments
+        self.instructions_only: bool = instructions_only
+        self.comments_cache: Optional[CommentsCache] = comments_cache
+
+        self._directory: Optional[str] = None
+        self._futures = []
+        self._claims = None
+
+    def __iter__(self):
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+        else:
+            context = multiprocessing.get_context()
+
+        self._directory = tempfile.mkdtemp(prefix='pydoc-ast-')
+
+        try:
+            with context.Manager() as manager:
+                self._claims = manager.dict()
+
+                with ProcessPoolExecutor(max_workers=self.jobs, mp_context=context, initializer=_initialize,
+                                         initargs=(self.sources, self._claims, self.cache,
+                                                   self.instructions_only, self.comments_cache)) as executor:
+                    for job, f in enumerate(self.files):
+                        ast = os.path.join(self._directory, '{}.ast'.format(job))
+                        self._futures.append(executor.submit(_parse, job, f, self.flags(f), self.options(f), ast,
+                                                                  not f in self.affected))
+
+                    try:
+                        for future in self._futures:
+                            yield future.result()
+                    finally:
+                        for future in self._futures:
+                            future.cancel()
+        finally:
+            self._claims = None
+            shutil.rmtree(self._directory, True)
+
+    def commentsdb(self, filename: str) -> Optional[CommentsDatabase]:
+        """
+        :param filename: The file for which the comments are needed.
+        :return: The comments database extracted by the worker that claimed
+         the file, or None if no worker extracted it.
+        """
+        claimant = self._claims.get(filename)
+
+        if claimant is None:
+            return None
+
+        # The claimant might still be running, wait for it.
+        return self._futures[claimant].result().commentsdbs.get(filename)
+
+# vi:ts=4:et
@@ -0,0 +1,91 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+from typing import List, Optional
+
+from Clang.exceptions.translation_unit import TranslationUnitLoadError
+from Clang.objects.index import Index
+from Clang.objects.translation_unit import TranslationUnit
+from Clang.utility.diagnostic import Diagnostic
+from Pydoc.cache.ast_cache import AstCache
+from Pydoc.cache.comments_cache import CommentsCache
+from Pydoc.comments.comments_database import CommentsDatabase
+from Pydoc.util.Struct import Struct
+
+# A parsed file: the translation unit, the (severity, message) pairs of its
+# diagnostics, the files it includes and the AST file it was loaded from or
+# saved to (None when the AST cache is not used).
+Parsed = Struct.define('Parsed', translation_unit=None, diagnostics=[], includes=[], ast=None)
+
+
+def is_fatal(diagnostics) -> bool:
+    """
+    :param diagnostics: List of (severity, message) pairs.
+    :return: True if any of the diagnostics is an error.
+    """
+    for severity, _ in diagnostics:
+        if severity == Diagnostic.Fatal or severity == Diagnostic.Error:
+            return True
+
+    return False
+
+
+def parse(index: Index, filename: str, flags: List[str], options: int = 0,
+          cache: Optional[AstCache] = None, lookup: bool = True) -> Parsed:
+    """
+    Parse a file, or load it from the AST cache when neither the file nor
+    the files it includes changed since it was stored. When lookup is False
+    the file is known to have changed, it is parsed and only stored.
+    """
+    if cache is not None and lookup:
+        entry = cache.lookup(filename, flags, options)
+
+        if entry is not None:
+            try:
+                return Parsed(translation_unit=index.read(entry.ast), diagnostics=entry.diagnostics,
+                              includes=entry.includes, ast=entry.ast)
+            except TranslationUnitLoadError:
+                # Clang refuses AST files whose inputs look modified
+                cache.evict(entry)
+
+    parsed = from_translation_unit(index.parse(filename, flags, options=options))
+
+    if cache is not None and not is_fatal(parsed.diagnostics):
+        parsed.ast = cache.store(filename, flags, options, parsed.translation_unit, parsed.includes,
+                                 parsed.diagnostics)
+
+    return parsed
+
+
+def comments(filename: str, translation_unit: TranslationUnit, cache: Optional[CommentsCache] = None,
+             instructions_only: bool = False) -> CommentsDatabase:
+    """
+    :return: The comments database of a file of the translation unit, from
+     the cache (if any) when the file did not change.
+    """
+    if cache is None:
+        return CommentsDatabase(filename, translation_unit, instructions_only=instructions_only)
+
+    return cache.extract(filename, translation_unit, instructions_only)
+
+
+def from_translation_unit(translation_unit: TranslationUnit) -> Parsed:
+    """
+    :return: The diagnostics and the includes of an already parsed
+     translation unit.
+    """
+    diagnostics = [(d.severity, d.format()) for d in translation_unit.diagnostics]
+    includes = [str(inc.include) for inc in translation_unit.get_includes()]
+
+    return Parsed(translation_unit=translation_unit, diagnostics=diagnostics, includes=includes)
+
+# vi:ts=4:et
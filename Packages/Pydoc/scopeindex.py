@@ -0,0 +1,156 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import bisect
+import re
+from typing import Dict, List, Optional, Pattern, Set
+
+# The characters that are not literals in a regular expression, and the ones
+# that make the preceding literal optional
+_special = set('.^$*+?{}[]\\|()')
+_optional = set('*?{')
+
+
+def literal_prefix(pattern: Pattern) -> str:
+    """
+    :return: A prefix of every name the pattern matches (from the start of
+     the name), the empty string when there is none.
+    """
+    text = pattern.pattern
+
+    if '|' in text or pattern.flags & re.IGNORECASE:
+        return ''
+
+    end = 0
+
+    while end < len(text) and text[end] not in _special:
+        end += 1
+
+    if end < len(text) and text[end] in _optional:
+        end -= 1
+
+    return text[:max(end, 0)]
+
+
+class _Scope(object):
+    def __init__(self):
+        # Map from a name to the nodes having it, and to their positions in
+        # resolve_nodes
+        self.nodes: Dict[str, List] = {}
+        self.positions: Dict[str, List[int]] = {}
+        self.size: int = 0
+        # The sorted names, built when first matching a regular expression
+        self.names: Optional[List[str]] = None
+
+    def add(self, name: str, node, position: int):
+        if name in self.nodes:
+            self.nodes[name].append(node)
+            self.positions[name].append(position)
+        else:
+            self.nodes[name] = [node]
+            self.positions[name] = [position]
+
+
+class ScopeIndex(object):
+    """
+    Index of the names that can be resolved in a scope, for resolving the
+    references of the comments. The index of a node maps a name to the nodes
+    of node.resolve_nodes having that name, in the same order. It is built
+    the first time the scope is looked up, and the index of a base class is
+    built once and merged into the index of every class inheriting from it.
+    """
+
+    def __init__(self):
+        # Indexed by the id of the node, the nodes are kept alive by the tree
+        self._scopes: Dict[int, _Scope] = {}
+        self._building: Set[int] = set()
+
+    def _build(self, node) -> _Scope:
+        scope = _Scope()
+        position = 0
+
+        for child in node.direct_resolve_nodes:
+            scope.add(child.name, child, position)
+            position += 1
+
+        # The scopes being built are skipped, so that a class inheriting from
+        # itself does not recurse forever
+        self._building.add(id(node))
+
+        try:
+            for inherited in node.inherited_scopes:
+                scope.add(inherited.name, inherited, position)
+                position += 1
+
+                if id(inherited) in self._building:
+                    continue
+
+                base = self._scope(inherited)
+
+                for name, nodes in base.nodes.items():
+                    for child, pos in zip(nodes, base.positions[name]):
+                        scope.add(name, child, position + pos)
+
+                position += base.size
+        finally:
+            self._building.discard(id(node))
+
+        scope.size = position
+        self._scopes[id(node)] = scope
+
+        return scope
+
+    def _scope(self, node) -> _Scope:
+        try:
+            return self._scopes[id(node)]
+        except KeyError:
+            return self._build(node)
+
+    def lookup(self, node, name: str) -> List:
+        """
+        :return: The nodes named name that can be resolved in node (the list
+         is kept by the index and must not be modified).
+        """
+        return self._scope(node).nodes.get(name, [])
+
+    def match(self, node, pattern: Pattern) -> List:
+        """
+        :return: The nodes that can be resolved in node with a name matched
+         by the pattern, in the order of resolve_nodes. Only the names
+         starting with the literal prefix of the pattern are matched.
+        """
+        scope = self._scope(node)
+
+        if scope.names is None:
+            scope.names = sorted(scope.nodes)
+
+        prefix = literal_prefix(pattern)
+        found = []
+
+        for i in range(bisect.bisect_left(scope.names, prefix), len(scope.names)):
+            name = scope.names[i]
+
+            if not name.startswith(prefix):
+                break
+
+            if pattern.match(name):
+                found.extend(zip(scope.positions[name], scope.nodes[name]))
+
+        found.sort(key=lambda x: x[0])
+
+        return [child for _, child in found]
+
+    def clear(self):
+        self._scopes = {}
+        self._building = set()
+
+# vi:ts=4:et
@@ -0,0 +1,115 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Plain python copies of the libclang objects kept by the documentation tree.
+
+The nodes of the tree refer to the cursors they were created from and their
+types refer to the declarations of the types. Once a translation unit has
+been visited, those are replaced by frozen copies (Node.snapshot), which
+hold everything used afterwards (building the hierarchy, merging,
+resolving references and generating), so the translation unit can be
+disposed and the tree can be pickled.
+"""
+from typing import Dict, Optional
+
+from Clang.cursor import Cursor
+from Clang.kinds.cursor_kind import CursorKind
+from Pydoc.util.location import Location
+
+
+class CursorSnapshot(object):
+    """
+    Frozen copy of a Cursor, with the same attributes as far as they are used
+    by the tree. Two snapshots are equal when they refer to the same entity,
+    even when they were taken from different translation units.
+    """
+
+    class Extent(object):
+        def __init__(self, start: Location, end: Location):
+            self.start: Location = start
+            self.end: Location = end
+
+    def __init__(self, kind: CursorKind, spelling: str, displayname: str, usr: str, location: Location,
+                 extent: Extent, enum_value: Optional[int] = None):
+        self.kind: CursorKind = kind
+        self.spelling: str = spelling
+        self.displayname: str = displayname
+        self.usr: str = usr
+        self.location: Location = location
+        self.extent: CursorSnapshot.Extent = extent
+        self.enum_value: Optional[int] = enum_value
+
+        self.semantic_parent: Optional[CursorSnapshot] = None
+        self.specialized_cursor_template: Optional[CursorSnapshot] = None
+
+        f = location.file
+        self._key = (kind.value, usr, f.name if f else None, location.offset, spelling)
+
+    def get_usr(self) -> str:
+        return self.usr
+
+    def __eq__(self, other):
+        # Never defer to Cursor.__eq__, which only accepts cursors
+        return isinstance(other, CursorSnapshot) and self._key == other._key
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __repr__(self) -> str:
+        return "<CursorSnapshot: {} {}>".format(self.kind, self.spelling)
+
+
+class Snapshot(object):
+    """
+    Takes the snapshots of the objects of one translation unit. Every cursor
+    is copied once, so nodes that shared a cursor share its snapshot.
+    """
+
+    def __init__(self):
+        # Map from the cursors to their snapshots
+        self._cursors: Dict[Cursor, CursorSnapshot] = {}
+
+    def cursor(self, cursor) -> Optional[CursorSnapshot]:
+        if cursor is None or isinstance(cursor, CursorSnapshot):
+            return cursor
+
+        if cursor in self._cursors:
+            return self._cursors[cursor]
+
+        extent = cursor.extent
+        enum_value = None
+
+        if cursor.kind == CursorKind.ENUM_CONSTANT_DECL:
+            enum_value = cursor.enum_value
+
+        snapshot = CursorSnapshot(cursor.kind, cursor.spelling, cursor.displayname, cursor.get_usr(),
+                                  self.location(cursor.location),
+                                  CursorSnapshot.Extent(self.location(extent.start), self.location(extent.end)),
+                                  enum_value)
+
+        # Register before following the parents, which may lead back here
+        self._cursors[cursor] = snapshot
+
+        snapshot.semantic_parent = self.cursor(cursor.semantic_parent)
+        snapshot.specialized_cursor_template = self.cursor(cursor.specialized_cursor_template)
+
+        return snapshot
+
+    @staticmethod
+    def location(location) -> Optional[Location]:
+        return Location.from_location(location)
+
+# vi:ts=4:et
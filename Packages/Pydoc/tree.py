@@ -13,28 +13,40 @@
 # -*- coding: utf-8 -*-
 
 import os
+import pickle
 import platform
 import sys
 from ctypes.util import find_library
-from tempfile import NamedTemporaryFile
-from typing import List, Callable, Optional, Tuple
-
-from Pydoc import example
+from typing import Dict, List, Callable, Optional, Set, Tuple
+
+from Pydoc import highlight
+from Pydoc import parsing
+from Pydoc.cache.ast_cache import AstCache
+from Pydoc.cache.comments_cache import CommentsCache
+from Pydoc.cache.highlight_cache import HighlightCache
+from Pydoc.cache.manifest import Manifest
 from Pydoc.documentmerger import DocumentMerger
 from Pydoc.files import includepaths
+from Pydoc.files.compile_commands import CompileCommands
 import Nodes
 
 from Clang.config import Config
+from Clang.cursor import Cursor
 from Clang.exceptions.lib_clang import LibclangError
+from Clang.exceptions.translation_unit import TranslationUnitLoadError
 from Clang.kinds.cursor_kind import CursorKind
 from Clang.objects.index import Index
 from Clang.utility.diagnostic import Diagnostic
 from Clang.objects.translation_unit import TranslationUnit
-from Clang.utility.token_kind import TokenKind
 from Pydoc.util.defdict import Defdict
+from Pydoc.comments import scanner
 from Pydoc.comments.comment import Comment
 from Pydoc.comments.comments_database import CommentsDatabase
 from Pydoc.files.provider_source import ProviderSource
+from Pydoc.highlight import ExampleHighlighter
+from Pydoc.parallel import ParsePool
+from Pydoc.scopeindex import ScopeIndex
+from Pydoc.snapshot import Snapshot
 from Nodes import Root
 
 if platform.system() == 'Darwin':
@@ -83,16 +95,62 @@ except LibclangError as e:
 
 
 class Tree(DocumentMerger):
-    def __init__(self, provider_source: ProviderSource, flags: str):
+    def __init__(self, provider_source: ProviderSource, flags: str, jobs: int = 1,
+                 ast_cache: Optional[AstCache] = None, manifest: Optional[Manifest] = None,
+                 compile_commands: Optional[CompileCommands] = None, only_compile_commands: bool = False,
+                 fast_parse: bool = False, include_cache: Optional[str] = None,
+                 refresh_include_cache: bool = False, index: Optional[Index] = None,
+                 libclang_comments: bool = False, comments_cache: Optional[CommentsCache] = None,
+                 highlight_cache: Optional[HighlightCache] = None):
         super().__init__()
         self.headers = {}
         self.processed = {}
-        self.index = Index.create()
-        self.flags = includepaths.flags(flags)
+        # An index can be shared between trees, see the daemon
+        self.index = Index.create() if index is None else index
+        self.flags = includepaths.flags(flags, include_cache, refresh_include_cache)
         self.provider_source: ProviderSource = provider_source
         self.processing = {}
         self.kindmap = {}
 
+        # Number of processes used for parsing the files
+        self.jobs: int = jobs
+        # Cache of parsed translation units kept between runs
+        self.ast_cache: Optional[AstCache] = ast_cache
+        # Comments extracted from the files, kept between runs
+        self.comments_cache: Optional[CommentsCache] = comments_cache
+        # Highlighting of the code examples, kept between runs
+        self.highlight_cache: Optional[HighlightCache] = highlight_cache
+        # Record of the previous run, used for reparsing only changed files
+        self.manifest: Optional[Manifest] = manifest
+        # Flags of the files built by the project
+        self.compile_commands: Optional[CompileCommands] = compile_commands
+        # Only parse the files that are in the compile commands
+        self.only_compile_commands: bool = only_compile_commands
+        # The include paths of the system, added to the flags of the
+        # compile commands
+        self.system_flags: List[str] = []
+        # Skip the bodies of the functions when parsing, only the
+        # declarations are documented
+        self.fast_parse: bool = fast_parse
+
+        if self.compile_commands is not None:
+            self.system_flags = includepaths.flags('', include_cache, refresh_include_cache)
+
+        # Take the comments of the nodes from libclang, the files are only
+        # scanned for Pydoc instructions. By default libclang only attaches
+        # documentation comments (/** and ///)
+        self.libclang_comments: bool = libclang_comments
+
+        if self.libclang_comments:
+            self.flags = self.flags + ['-fparse-all-comments']
+            self.system_flags = self.system_flags + ['-fparse-all-comments']
+
+        # When set, the parsed translation units are kept in it (by file)
+        # and reparsed when changed instead of parsed again, see Watcher
+        self.translation_units: Optional[Dict[str, TranslationUnit]] = None
+        # Map from parsed file to the files it includes
+        self.includes: Dict[str, List[str]] = {}
+
         # Things to skip
         self.kindmap[CursorKind.USING_DIRECTIVE] = None
 
@@ -112,9 +170,28 @@ class Tree(DocumentMerger):
         # Map from category name to the nodes.Category for that category
         self.category_to_node = Defdict()
 
+        # Names that can be resolved in the scopes, built while cross
+        # referencing
+        self.scope_index: ScopeIndex = ScopeIndex()
+
         # Map from filename to comment.CommentsDatabase
         self.commentsdbs = Defdict()
 
+        # Map from (filename, offset) of a cursor to its cleaned comment, in
+        # the libclang comments mode
+        self.raw_comments: Dict[Tuple[str, int], str] = {}
+
+        # Per translation unit map from File.handle to the name of the file
+        # if its cursors are visited (None otherwise), and to whether its
+        # cursors are exposed.
+        self.visited_files: Dict[int, Optional[str]] = {}
+        self.exposed_files: Dict[int, bool] = {}
+
+        # The nodes and the cursors (keys of cursor_to_node) that refer to
+        # the translation unit being visited, see snapshot_translation_unit
+        self.visited_nodes = []
+        self.visited_cursors = []
+
         self.qid_to_node[None] = self.root
         self.usr_to_node[None] = self.root
 
@@ -201,8 +278,39 @@ class Tree(DocumentMerger):
     def is_header(self, filename):
         return filename.endswith('.hh') or filename.endswith('.hpp') or filename.endswith('.h')
 
+    def record_comment(self, cursor: Cursor) -> None:
+        """
+        Keep the comment libclang attached to a cursor (if any), in the
+        libclang comments mode.
+        """
+        if not self.libclang_comments:
+            return
+
+        text = cursor.raw_comment
+
+        if not text:
+            return
+
+        location = cursor.extent.start
+
+        if location.file is None:
+            return
+
+        cleaned = scanner.clean_raw_comment(text, cursor.comment_extent.start.column)
+
+        if cleaned is not None:
+            self.raw_comments[(location.file.name, location.offset)] = cleaned
+
     def find_node_comment(self, node):
         for location in node.comment_locations:
+            if self.libclang_comments:
+                text = self.raw_comments.get((location.file.name, location.offset))
+
+                if text is not None:
+                    return Comment(text, location)
+
+                continue
+
             db = self.commentsdbs[location.file.name]
 
             if db:
@@ -213,65 +321,261 @@ class Tree(DocumentMerger):
 
         return None
 
-    def process(self):
+    def check_diagnostics(self, filename: str, diagnostics) -> None:
         """
-        process processes all the files with clang and extracts all relevant
-        nodes from the generated AST
+        Log the diagnostics found while parsing a file and stop the
+        generation if any of them is an error.
+        :param filename: The file that was parsed.
+        :param diagnostics: List of (severity, formatted message) pairs.
         """
-        self.logger.informational("Starting processing with CLang")
+        if len(diagnostics) == 0:
+            return
+
+        self.logger.warning("Found {} diagnostics for the file: {}".format(
+            len(diagnostics), os.path.basename(filename)))
+        fatal = False
+
+        for severity, message in diagnostics:
+            if severity == Diagnostic.Fatal or severity == Diagnostic.Error:
+                fatal = True
+                self.logger.critical(message)
+            else:
+                self.logger.warning(message)
+
+        if fatal:
+            self.logger.critical("Could not generate documentation due to parser errors")
+            sys.exit(1)
+
+    def process_translation_unit(self, f: str, translation_unit: TranslationUnit, includes: List[str],
+                                 commentsdb: Callable[[str], CommentsDatabase]) -> None:
+        """
+        Extract the comments and the nodes of a parsed file.
+        :param f: The file that was parsed.
+        :param translation_unit: The translation unit of the file.
+        :param includes: The files included (transitively) by the file.
+        :param commentsdb: Callback returning the comments database of a file.
+        """
+        self.includes[f] = includes
+
+        # Extract comments from files and included files that we are
+        # supposed to inspect
+        extractfiles: List[str] = [f]
+
+        for filename in includes:
+            self.headers[filename] = True
+
+            if filename in self.processed or (not filename in self.provider_source) or filename in extractfiles:
+                continue
+
+            extractfiles.append(filename)
+
+        for extracted in extractfiles:
+            db = commentsdb(extracted)
+
+            self.add_categories(db.category_names)
+            db.detach()
+            self.commentsdbs[extracted] = db
 
-        for f in self.provider_source:
+        # File handles are only valid within their translation unit
+        self.visited_files = {}
+        self.exposed_files = {}
+        # The declarations of the methods only tell whether they have a body
+        # when the bodies were not skipped
+        Nodes.Method.skipped_bodies = bool(self.file_options(f) & TranslationUnit.PARSE_SKIP_FUNCTION_BODIES)
+
+        self.visit(translation_unit.cursor)
+
+        self.visited_files = {}
+        self.exposed_files = {}
+        Nodes.Method.skipped_bodies = False
+
+        self.snapshot_translation_unit()
+
+        for f in self.processing:
+            self.processed[f] = True
+
+        self.processing = {}
+
+    def file_flags(self, filename: str) -> List[str]:
+        """
+        :param filename: The file to parse.
+        :return: The flags of the file in the compile commands, or the
+         global flags if the file is not in the compile commands.
+        """
+        if self.compile_commands is not None:
+            flags = self.compile_commands.flags(filename)
+
+            if flags is not None:
+                return flags + self.system_flags
+
+        return self.flags
+
+    def file_options(self, filename: str) -> int:
+        """
+        :param filename: The file to parse.
+        :return: The TranslationUnit.PARSE_XXX options used for parsing the
+         file. In fast parse mode the function bodies are skipped and
+         headers, which are parsed on their own, may be incomplete.
+        """
+        if not self.fast_parse:
+            return TranslationUnit.PARSE_NONE
+
+        options = TranslationUnit.PARSE_SKIP_FUNCTION_BODIES
+
+        if self.is_header(filename):
+            options |= TranslationUnit.PARSE_INCOMPLETE
+
+        return options
+
+    def parsed_files(self) -> List[str]:
+        """
+        :return: The files to parse, all the sources or only those in the
+         compile commands. Comments are extracted from all the sources.
+        """
+        if self.only_compile_commands and self.compile_commands is not None:
+            return [f for f in self.provider_source if f in self.compile_commands]
+
+        return list(self.provider_source)
+
+    def affected_files(self) -> List[str]:
+        """
+        :return: The files that must be reparsed because they, or a file
+         they include, changed since the previous run. All the files if
+         there is no manifest.
+        """
+        if self.manifest is None:
+            return self.parsed_files()
+
+        return [f for f in self.parsed_files() if self.manifest.is_affected(f, self.file_flags(f))]
+
+    def parse_file(self, f: str, flags: List[str], changed: bool) -> parsing.Parsed:
+        """
+        :param f: The file to parse.
+        :param flags: The flags of the file.
+        :param changed: True if the file is known to have changed.
+        :return: The file parsed, loaded from the AST cache or, when the
+         translation units are kept, reparsed if changed.
+        """
+        options = self.file_options(f)
+
+        if self.translation_units is None:
+            return parsing.parse(self.index, f, flags, options, cache=self.ast_cache, lookup=not changed)
+
+        translation_unit = self.translation_units.get(f)
+
+        if translation_unit is None:
+            # The preamble (the includes) is precompiled on the first reparse
+            # and reused by the following ones
+            parsed = parsing.parse(self.index, f, flags, options | TranslationUnit.PARSE_PRECOMPILED_PREAMBLE)
+            self.translation_units[f] = parsed.translation_unit
+
+            return parsed
+
+        if changed:
+            self.logger.informational("Reparsing the file: {}".format(os.path.basename(f)))
+
+            try:
+                translation_unit.reparse()
+            except TranslationUnitLoadError:
+                # The translation unit can not be used anymore, parse the
+                # file again (which fails if it was removed)
+                del self.translation_units[f]
+                return self.parse_file(f, flags, changed)
+
+        return parsing.from_translation_unit(translation_unit)
+
+    def _process_serial(self, affected):
+        for f in self.parsed_files():
             self.logger.informational("Processing the file: {}".format(os.path.basename(f)))
             if f in self.processed:
                 self.logger.informational("The file '{}' has already been processed".format(os.path.basename(f)))
 
-            translation_unit: TranslationUnit = self.index.parse(f, self.flags)
+            flags = self.file_flags(f)
 
-            if len(translation_unit.diagnostics) != 0:
-                self.logger.warning("Found {} diagnostics for the file: {}".format(
-                    len(translation_unit.diagnostics), os.path.basename(f)))
-                fatal = False
+            try:
+                parsed = self.parse_file(f, flags, f in affected)
+            except TranslationUnitLoadError:
+                self.logger.critical("Could not parse file {}...".format(os.path.basename(f)))
+                sys.exit(1)
 
-                for d in translation_unit.diagnostics:
-                    if d.severity == Diagnostic.Fatal or d.severity == Diagnostic.Error:
-                        fatal = True
-                        self.logger.critical(d.format())
-                    else:
-                        self.logger.warning(d.format())
+            translation_unit: TranslationUnit = parsed.translation_unit
 
-                if fatal:
-                    self.logger.critical("Could not generate documentation due to parser errors")
-                    sys.exit(1)
+            self.check_diagnostics(f, parsed.diagnostics)
 
             if not translation_unit:
                 self.logger.critical("Could not parse file {}...".format(os.path.basename(f)))
                 sys.exit(1)
 
-            # Extract comments from files and included files that we are
-            # supposed to inspect
-            extractfiles: List[str] = [f]
+            self.process_translation_unit(f, translation_unit, parsed.includes,
+                                          lambda extracted: parsing.comments(
+                                              extracted, translation_unit, self.comments_cache,
+                                              self.libclang_comments))
 
-            for inc in translation_unit.get_includes():
-                filename = str(inc.include)
-                self.headers[filename] = True
+            if self.manifest is not None:
+                self.manifest.record_source(f, flags, parsed.includes)
 
-                if filename in self.processed or (not filename in self.provider_source) or filename in extractfiles:
-                    continue
+    def _process_parallel(self, affected):
+        pool = ParsePool(self.parsed_files(), self.file_flags, self.jobs, self.ast_cache, affected,
+                         list(self.provider_source), self.file_options, self.libclang_comments,
+                         self.comments_cache)
 
-                extractfiles.append(filename)
+        for result in pool:
+            f = result.filename
 
-            for extracted in extractfiles:
-                db = CommentsDatabase(extracted, translation_unit)
+            self.logger.informational("Processing the file: {}".format(os.path.basename(f)))
+            if f in self.processed:
+                self.logger.informational("The file '{}' has already been processed".format(os.path.basename(f)))
+
+            if result.error:
+                self.logger.critical("Could not parse file {}...".format(os.path.basename(f)))
+                sys.exit(1)
+
+            self.check_diagnostics(f, result.diagnostics)
+
+            if result.aborted:
+                sys.exit(1)
+
+            translation_unit: TranslationUnit = self.index.read(result.ast)
+
+            def commentsdb(extracted):
+                db = pool.commentsdb(extracted)
+
+                # Not extracted by any worker, do it here
+                if db is None:
+                    db = parsing.comments(extracted, translation_unit, self.comments_cache, self.libclang_comments)
+
+                return db
+
+            self.process_translation_unit(f, translation_unit, result.includes, commentsdb)
+
+            if self.manifest is not None:
+                self.manifest.record_source(f, self.file_flags(f), result.includes)
+
+    def process(self, affected: Optional[Set[str]] = None):
+        """
+        process processes all the files with clang and extracts all relevant
+        nodes from the generated AST
+        :param affected: The files known to have changed, by default given
+         by the manifest (if any).
+        """
+        self.logger.informational("Starting processing with CLang")
 
-                self.add_categories(db.category_names)
-                self.commentsdbs[extracted] = db
+        # Files known to have changed, these are not looked up in the cache
+        if affected is None:
+            affected = set()
 
-            self.visit(translation_unit.cursor.get_children())
+            if self.manifest is not None:
+                affected = set(self.affected_files())
 
-            for f in self.processing:
-                self.processed[f] = True
+        if self.manifest is not None:
+            self.logger.informational("{} of {} files changed since the previous run".format(
+                len(affected), len(self.parsed_files())))
 
-            self.processing = {}
+        # The translation units kept can only be reparsed in this process
+        if self.jobs > 1 and self.translation_units is None:
+            self._process_parallel(affected)
+        else:
+            self._process_serial(affected)
 
         # Construct hierarchy of nodes.
         for node in self.all_nodes:
@@ -314,7 +618,12 @@ class Tree(DocumentMerger):
         for qid in classes:
             classes[qid].resolve_bases(classes)
 
+        for qid in classes:
+            classes[qid].resolve_overrides()
+
     def markup_code(self, index):
+        examples = []
+
         for node in self.all_nodes:
             if node.comment is None:
                 continue
@@ -325,76 +634,26 @@ class Tree(DocumentMerger):
             comps = node.comment.doc.components
 
             for i in range(len(comps)):
-                component = comps[i]
-
-                if not isinstance(component, Comment.Example):
-                    continue
-
-                text = str(component)
-
-                tmpfile = NamedTemporaryFile(delete=False)
-                tmpfile.write(text)
-                filename = tmpfile.name
-                tmpfile.close()
-
-                tu = index.parse(filename, self.flags, options=1)
-                tokens = tu.get_tokens(extent=tu.get_extent(filename, (0, os.stat(filename).st_size)))
-                os.unlink(filename)
-
-                hl = []
-                incstart = None
+                if isinstance(comps[i], Comment.Example):
+                    examples.append((comps, i, str(comps[i])))
 
-                for token in tokens:
-                    start = token.extent.start.offset
-                    end = token.extent.end.offset
-
-                    if token.kind == TokenKind.KEYWORD:
-                        hl.append((start, end, 'keyword'))
-                        continue
-                    elif token.kind == TokenKind.COMMENT:
-                        hl.append((start, end, 'comment'))
-
-                    cursor = token.cursor
-
-                    if cursor.kind == CursorKind.PREPROCESSING_DIRECTIVE:
-                        hl.append((start, end, 'preprocessor'))
-                    elif cursor.kind == CursorKind.INCLUSION_DIRECTIVE and incstart is None:
-                        incstart = cursor
-                    elif (not incstart is None) and \
-                            token.kind == TokenKind.PUNCTUATION and \
-                            token.spelling == '>':
-                        hl.append((incstart.extent.start.offset, end, 'preprocessor'))
-                        incstart = None
-
-                ex = example.Example()
-                lastpos = 0
-
-                for ih in range(len(hl)):
-                    h = hl[ih]
-
-                    ex.append(text[lastpos:h[0]])
-                    ex.append(text[h[0]:h[1]], h[2])
-
-                    lastpos = h[1]
+        if not examples:
+            return
 
-                ex.append(text[lastpos:])
-                comps[i] = ex
+        highlighter = ExampleHighlighter(index, self.flags, self.highlight_cache)
+        highlighted = highlighter.highlight(text for _, _, text in examples)
 
-    def match_ref(self, child, name):
-        if isinstance(name, str):
-            return name == child.name
-        else:
-            return name.match(child.name)
+        for comps, i, text in examples:
+            comps[i] = highlight.to_example(text, highlighted[text])
 
     def find_ref(self, node, name, goup):
         if node is None:
             return []
 
-        ret = []
-
-        for child in node.resolve_nodes:
-            if self.match_ref(child, name):
-                ret.append(child)
+        if isinstance(name, str):
+            ret = self.scope_index.lookup(node, name)
+        else:
+            ret = self.scope_index.match(node, name)
 
         if goup and len(ret) == 0:
             return self.find_ref(node.parent, name, True)
@@ -409,7 +668,14 @@ class Tree(DocumentMerger):
             self.cross_ref_node(child)
 
     def cross_ref(self):
+        # After merging, the merged comments can be inherited
+        for node in self.all_nodes:
+            if isinstance(node, Nodes.Method):
+                node.resolve_inherit()
+
+        self.scope_index.clear()
         self.cross_ref_node(self.root)
+        self.scope_index.clear()
         self.markup_code(self.index)
 
     def decl_on_c_struct(self, node, tp):
@@ -468,11 +734,57 @@ class Tree(DocumentMerger):
 
         return self.root
 
+    def snapshot_translation_unit(self):
+        """
+        Replace the cursors, types and locations of the nodes created or
+        referenced while visiting the last translation unit with plain
+        copies, so that the translation unit can be disposed.
+        """
+        snapshot = Snapshot()
+
+        for node in self.visited_nodes:
+            node.snapshot(snapshot)
+
+        for cursor in self.visited_cursors:
+            if cursor in self.cursor_to_node:
+                node = self.cursor_to_node.pop(cursor)
+                self.cursor_to_node[snapshot.cursor(cursor)] = node
+
+        self.visited_nodes = []
+        self.visited_cursors = []
+
+    # The state of the tree once processed, saved and loaded by save and load.
+    saved_attributes = ['headers', 'processed', 'root', 'all_nodes', 'cursor_to_node', 'usr_to_node',
+                        'qid_to_node', 'category_to_node', 'commentsdbs', 'raw_comments']
+
+    def save(self, filename: str) -> None:
+        """
+        Save the processed tree, it can be loaded for merging, resolving the
+        references and generating without parsing the files again.
+        """
+        state = {name: getattr(self, name) for name in Tree.saved_attributes}
+
+        with open(filename, 'wb') as f:
+            pickle.dump(state, f, pickle.HIGHEST_PROTOCOL)
+
+    def load(self, filename: str) -> None:
+        """
+        Load a tree saved with save, instead of processing the files.
+        """
+        with open(filename, 'rb') as f:
+            state = pickle.load(f)
+
+        for name in Tree.saved_attributes:
+            setattr(self, name, state[name])
+
     def register_node(self, node, parent=None):
         self.all_nodes.append(node)
+        self.visited_nodes.append(node)
 
         self.usr_to_node[node.cursor.get_usr()] = node
         self.cursor_to_node[node.cursor] = node
+        self.visited_cursors.append(node.cursor)
+        self.record_comment(node.cursor)
 
         # Typedefs in clang are not parents of typedefs, but we like it better
         # that way, explicitly set the parent directly here
@@ -485,6 +797,7 @@ class Tree(DocumentMerger):
     def register_anon_typedef(self, node, parent):
         node.typedef = parent
         node.add_comment_location(parent.cursor.extent.start)
+        self.visited_nodes.append(node)
 
         self.all_nodes.remove(parent)
 
@@ -494,8 +807,36 @@ class Tree(DocumentMerger):
 
     def cursor_is_exposed(self, cursor):
         # Only cursors which are in headers are exposed.
-        filename = str(cursor.location.file)
-        return filename in self.headers or self.is_header(filename)
+        f = cursor.location.file
+        handle = f.handle
+
+        if not handle in self.exposed_files:
+            filename = str(f)
+            self.exposed_files[handle] = filename in self.headers or self.is_header(filename)
+
+        return self.exposed_files[handle]
+
+    def visited_file(self, f) -> Optional[str]:
+        """
+        :param f: The File of a cursor.
+        :return: The name of the file if its cursors must be visited, or None
+         if the file was already processed or is not one of the sources. The
+         decision is cached by file handle for the current translation unit,
+         so the name of the file is only retrieved once.
+        """
+        handle = f.handle
+
+        if not handle in self.visited_files:
+            filename = str(f)
+
+            # Ignore files we already processed and files other than the
+            # ones we are scanning for
+            if filename in self.processed or not filename in self.provider_source:
+                filename = None
+
+            self.visited_files[handle] = filename
+
+        return self.visited_files[handle]
 
     def is_unique_anon_struct(self, node, parent):
         if not node:
@@ -509,46 +850,50 @@ class Tree(DocumentMerger):
 
         return not isinstance(parent, Nodes.Typedef)
 
-    def visit(self, citer, parent=None):
+    def visit(self, cursor, parent=None):
         """
-        visit iterates over the provided cursor iterator and creates nodes
-        from the AST cursors.
+        visit walks the descendants of the provided cursor in a single pass
+        and creates nodes from the AST cursors. Subtrees that do not need
+        to be visited are pruned from the walk.
         """
-        if not citer:
-            return
+        # The cursors whose children are being visited, with the node that
+        # is the parent of those children.
+        stack = [(cursor, parent)]
 
-        while True:
-            try:
-                item = next(citer)
-            except StopIteration:
-                return
+        def visitor(item, item_parent):
+            # Leave the subtrees that have been completely visited
+            while stack[-1][0] != item_parent:
+                stack.pop()
+
+            parent = stack[-1][1]
 
             # Check the source of item
-            if not item.location.file:
-                self.visit(item.get_children())
-                continue
+            f = item.location.file
 
-            # Ignore files we already processed
-            if str(item.location.file) in self.processed:
-                continue
+            if not f:
+                stack.append((item, None))
+                return Cursor.VISIT_RECURSE
 
-            # Ignore files other than the ones we are scanning for
-            if not str(item.location.file) in self.provider_source:
-                continue
+            # Ignore files we already processed and files other than the
+            # ones we are scanning for, with their whole subtree
+            filename = self.visited_file(f)
+
+            if filename is None:
+                return Cursor.VISIT_CONTINUE
 
             # Ignore unexposed things
             if item.kind == CursorKind.UNEXPOSED_DECL:
-                self.visit(item.get_children(), parent)
-                continue
+                stack.append((item, parent))
+                return Cursor.VISIT_RECURSE
 
-            self.processing[str(item.location.file)] = True
+            self.processing[filename] = True
 
             if item.kind in self.kindmap:
                 cls = self.kindmap[item.kind]
 
                 if not cls:
                     # Skip
-                    continue
+                    return Cursor.VISIT_CONTINUE
 
                 # see if we already have a node for this thing
                 node = self.usr_to_node[item.get_usr()]
@@ -569,9 +914,14 @@ class Tree(DocumentMerger):
                 else:
                     self.cursor_to_node[item] = node
                     node.add_ref(item)
+                    self.record_comment(item)
+
+                    self.visited_nodes.append(node)
+                    self.visited_cursors.append(item)
 
                 if node and node.process_children:
-                    self.visit(item.get_children(), node)
+                    stack.append((item, node))
+                    return Cursor.VISIT_RECURSE
             else:
                 par = self.cursor_to_node[item.semantic_parent]
 
@@ -579,7 +929,7 @@ class Tree(DocumentMerger):
                     par = parent
 
                 if par:
-                    ret = par.visit(item, citer)
+                    ret = par.visit(item)
 
                     if not ret is None:
                         for node in ret:
@@ -590,4 +940,8 @@ class Tree(DocumentMerger):
                 if (not par or ret is None) and not item.kind in ignoretop:
                     self.logger.warning("Unhandled cursor: {}".format(item.kind))
 
+            return Cursor.VISIT_CONTINUE
+
+        cursor.walk(visitor)
+
 # vi:ts=4:et
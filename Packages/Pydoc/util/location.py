@@ -0,0 +1,58 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+
+class Location(object):
+    """
+    Plain python copy of a Clang SourceLocation. It exposes the same
+    attributes (file, line, column and offset) but does not keep the
+    translation unit alive, so it can be pickled and sent between processes.
+    """
+
+    class File(object):
+        def __init__(self, name: str):
+            self.name: str = name
+
+        def __str__(self) -> str:
+            return self.name
+
+        def __repr__(self) -> str:
+            return "<File: {}>".format(self.name)
+
+    def __init__(self, filename, line: int = 0, column: int = 0, offset: int = 0):
+        if filename is None:
+            self.file = None
+        else:
+            self.file = Location.File(filename)
+
+        self.line: int = line
+        self.column: int = column
+        self.offset: int = offset
+
+    @staticmethod
+    def from_location(location):
+        """
+        :param location: A SourceLocation (or an already plain Location).
+        :return: The plain copy of the location.
+        """
+        if isinstance(location, Location) or location is None:
+            return location
+
+        f = location.file
+
+        return Location(f.name if f else None, location.line, location.column, location.offset)
+
+    def __repr__(self) -> str:
+        return "File: {}, Line: {}, Column: {}".format(self.file, self.line, self.column)
+
+# vi:ts=4:et
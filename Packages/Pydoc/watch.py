@@ -0,0 +1,257 @@
+# This file is part of Pydoc.  Pydoc is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Regeneration of the documentation while the sources are edited.
+
+The translation units are kept between the builds and only the ones that
+include a changed file are reparsed (with a precompiled preamble), the others
+are only visited again. When only merged description files changed nothing
+is parsed: the processed tree saved after the last build is loaded again and
+only merged, cross referenced and generated.
+"""
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from Clang.objects.translation_unit import TranslationUnit
+from Pydoc.logger.consolelogger import ConsoleLogger
+from Pydoc.logger.ilogger import ILogger
+from Pydoc.tree import Tree
+
+
+class Watcher(object):
+    """
+    Polls the modification times of the parsed files, the files they include
+    and the merged files and rebuilds the documentation when one changes.
+    create_tree gives a new (unprocessed) tree and generate merges, cross
+    references and generates a processed tree. files gives the files to
+    parse, expanding the globs again so that added and removed files are
+    noticed.
+    """
+
+    def __init__(self, create_tree: Callable[[], Tree], generate: Callable[[Tree], None], merge: List[str],
+                 interval: float = 1.0, files: Optional[Callable[[], List[str]]] = None):
+        self.create_tree: Callable[[], Tree] = create_tree
+        self.generate: Callable[[Tree], None] = generate
+        self.merge: List[str] = merge
+        self.interval: float = interval
+        self.files: Optional[Callable[[], List[str]]] = files
+        self.logger: ILogger = ConsoleLogger()
+
+        # Kept between the builds, shared with every tree
+        self.translation_units: Dict[str, TranslationUnit] = {}
+        self.includes: Dict[str, List[str]] = {}
+        self.tree: Optional[Tree] = None
+        # The last build stopped on an error
+        self.failed: bool = False
+        # Changed files not yet processed by a successful build
+        self.pending: Set[str] = set()
+
+        # Modification times of the sources and of the merged files
+        self.sources: Dict[str, int] = {}
+        self.merged: Dict[str, int] = {}
+
+        self._directory: str = tempfile.mkdtemp(prefix='pydoc-watch-')
+        self._saved: str = os.path.join(self._directory, 'tree.pickle')
+
+    @staticmethod
+    def _mtime(path: str) -> int:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return -1
+
+    def _now(self) -> int:
+        """
+        :return: The current time, by the clock of the modification times.
+        """
+        stamp = os.path.join(self._directory, 'stamp')
+
+        with open(stamp, 'w'):
+            pass
+
+        return self._mtime(stamp)
+
+    def _source_files(self) -> Set[str]:
+        # The parsed files are known once a tree was created
+        files = set(self.tree.parsed_files()) if self.tree is not None else set()
+
+        if self.files is not None:
+            files.update(self.files())
+
+        for includes in self.includes.values():
+            files.update(includes)
+
+        return files
+
+    def _merged_files(self) -> List[str]:
+        files = []
+
+        for path in self.merge:
+            if os.path.isdir(path):
+                for root, dirs, names in os.walk(path):
+                    files.extend(os.path.join(root, name) for name in names)
+            else:
+                files.append(path)
+
+        return files
+
+    def _scan(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        sources = {f: self._mtime(f) for f in self._source_files()}
+        merged = {f: self._mtime(f) for f in self._merged_files()}
+
+        return sources, merged
+
+    def changes(self) -> Tuple[Set[str], bool]:
+        """
+        :return: The sources changed since the previous call and whether a
+         merged file changed (or was added or removed).
+        """
+        sources, merged = self._scan()
+
+        changed = set(f for f, mtime in sources.items() if self.sources.get(f) != mtime)
+        # Removed from the globs
+        changed.update(f for f in self.sources if not f in sources)
+        markdown = merged != self.merged
+
+        self.sources, self.merged = sources, merged
+
+        return changed, markdown
+
+    def add_sources(self, since: int):
+        """
+        Adds the sources found by a build (the included files) to the
+        watched ones. Those modified since the build started are left out,
+        so the next call to changes gives them.
+        """
+        for f in self._source_files():
+            if not f in self.sources:
+                mtime = self._mtime(f)
+
+                if mtime < since:
+                    self.sources[f] = mtime
+
+    def affected(self, changed: Set[str]) -> Set[str]:
+        """
+        :param changed: The changed sources.
+        :return: The parsed files that are, or include, a changed file.
+        """
+        return set(f for f in self.tree.parsed_files()
+                   if f in changed or not changed.isdisjoint(self.includes.get(f, [])))
+
+    def build(self, affected: Optional[Set[str]] = None):
+        """
+        Processes a new tree reusing the kept translation units, the ones in
+        affected (and the ones a failed build did not get to) are reparsed.
+        """
+        if affected is not None:
+            self.pending.update(affected)
+            affected = set(self.pending)
+
+        self.tree = self.create_tree()
+
+        # Forget the files that are no longer parsed
+        parsed = set(self.tree.parsed_files())
+
+        for f in list(self.translation_units):
+            if not f in parsed:
+                del self.translation_units[f]
+                self.includes.pop(f, None)
+
+        self.tree.translation_units = self.translation_units
+        self.tree.includes = self.includes
+        self.tree.process(affected)
+        self.tree.save(self._saved)
+
+        self.generate(self.tree)
+        self.failed = False
+        self.pending = set()
+
+    def reload(self):
+        """
+        Generates again from the tree saved after the last processing, in a
+        new tree (create_tree might have changed, see the daemon).
+        """
+        self.tree = self.create_tree()
+        self.tree.translation_units = self.translation_units
+        self.tree.includes = self.includes
+        self.tree.load(self._saved)
+        self.generate(self.tree)
+        self.failed = False
+
+    def update(self, force: bool = False) -> bool:
+        """
+        Brings the documentation up to date with the files.
+        :param force: Generate even if nothing changed.
+        :return: True if the documentation was generated.
+        """
+        try:
+            if self.tree is None:
+                # Take the modification times before the first build (the
+                # longest one), the files saved meanwhile are built again
+                started = self._now()
+                self.changes()
+                self.build()
+                self.add_sources(started)
+                return True
+
+            changed, markdown = self.changes()
+
+            if changed:
+                affected = self.affected(changed)
+                self.logger.informational("{} changed, reparsing {} files".format(
+                    ', '.join(sorted(os.path.basename(f) for f in changed)), len(affected)))
+                self.build(affected)
+            elif not markdown and not force:
+                return False
+            elif self.failed:
+                # The saved tree might be older than the sources, process
+                # again (reparsing only what is pending)
+                self.build(set())
+            else:
+                self.logger.informational("Generating again from the saved tree")
+                self.reload()
+
+            return True
+        except SystemExit:
+            # The error has already been written
+            self.failed = True
+            raise
+
+    def close(self):
+        shutil.rmtree(self._directory, True)
+
+    def run(self):
+        """
+        Builds the documentation and then rebuilds it on every change, until
+        interrupted.
+        """
+        print("Watching for changes, press Ctrl+C to stop")
+
+        try:
+            while True:
+                try:
+                    if self.update():
+                        print("Documentation updated, watching for changes")
+                except SystemExit:
+                    print("Build failed, watching for changes")
+
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+# vi:ts=4:et
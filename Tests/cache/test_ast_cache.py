@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Pydoc.cache.ast_cache import AstCache
+
+
+class SavedTranslationUnit:
+    """
+    Stands in for a parsed translation unit, only save is used by the cache.
+    """
+
+    def save(self, filename: str):
+        with open(filename, 'w') as f:
+            f.write('ast')
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.source = self.write('a.cc', '#include "a.hh"\n')
+        self.header = self.write('a.hh', 'int a();\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory, name)
+
+        with open(path, 'w') as f:
+            f.write(content)
+
+        return path
+
+    def store(self, flags):
+        cache = AstCache(os.path.join(self.directory, 'cache'))
+        return cache.store(self.source, flags, 0, SavedTranslationUnit(), [self.header], [(2, 'warning')])
+
+    def lookup(self, flags):
+        return AstCache(os.path.join(self.directory, 'cache')).lookup(self.source, flags)
+
+    def test_lookup_after_store(self):
+        ast = self.store(['-I/include'])
+        entry = self.lookup(['-I/include'])
+
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry.ast, ast)
+        self.assertEqual(entry.includes, [self.header])
+        self.assertEqual(entry.diagnostics, [(2, 'warning')])
+
+    def test_lookup_empty(self):
+        self.assertIsNone(self.lookup([]))
+
+    def test_lookup_other_flags(self):
+        self.store(['-I/include'])
+        self.assertIsNone(self.lookup(['-I/other']))
+
+    def test_lookup_changed_source(self):
+        self.store([])
+        self.write('a.cc', '#include "a.hh"\nint b();\n')
+        self.assertIsNone(self.lookup([]))
+
+    def test_lookup_changed_include(self):
+        self.store([])
+        self.write('a.hh', 'int a(int);\n')
+        self.assertIsNone(self.lookup([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Pydoc.cache.comments_cache import CommentsCache
+from Pydoc.cache.digest import file_digest
+
+
+class TestCommentsCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = CommentsCache(os.path.join(self.directory, 'cache'))
+        self.header = self.write('a.hh', '// Pydoc:begin-category(A)\n\n'
+                                         '/* The a function. */\nint a();\n\n'
+                                         '// Pydoc:end-category()\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory, name)
+
+        with open(path, 'w') as f:
+            f.write(content)
+
+        return path
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.lookup(self.header, file_digest(self.header)))
+
+    def test_extract_stores(self):
+        extracted = self.cache.extract(self.header, None)
+        cached = self.cache.lookup(self.header, file_digest(self.header))
+
+        self.assertIsNotNone(cached)
+        self.assertEqual(list(cached), list(extracted))
+        self.assertEqual([c.location.offset for c in cached.comments], [c.location.offset for c in extracted.comments])
+        self.assertEqual(cached.comments[0].location.line, 4)
+        self.assertEqual(list(cached.category_names), ['A'])
+        self.assertEqual(cached.lookup_category(cached.comments[0].location), 'A')
+
+    def test_content_key(self):
+        self.cache.extract(self.header, None)
+        copy = self.write('b.hh', open(self.header).read())
+
+        cached = self.cache.lookup(copy, file_digest(copy))
+        self.assertEqual(cached.comments[0].location.file.name, copy)
+
+        self.write('a.hh', '/* Changed. */\nint a();\n')
+        self.assertIsNone(self.cache.lookup(self.header, file_digest(self.header)))
+        self.assertEqual(list(self.cache.extract(self.header, None)), ['Changed.'])
+
+    def test_instructions_only(self):
+        self.cache.extract(self.header, None)
+        self.assertIsNone(self.cache.lookup(self.header, file_digest(self.header), instructions_only=True))
+        self.assertEqual(len(self.cache.extract(self.header, None, instructions_only=True)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
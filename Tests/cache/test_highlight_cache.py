@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Clang.kinds.cursor_kind import CursorKind
+from Clang.utility.token_kind import TokenKind
+from Pydoc import highlight
+from Pydoc.cache.highlight_cache import HighlightCache
+from Pydoc.highlight import ExampleHighlighter
+
+
+class TestHighlightCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = HighlightCache(os.path.join(self.directory, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_store(self):
+        d = highlight.digest('int a;', ['-x', 'c++'])
+
+        self.assertIsNone(self.cache.lookup(d))
+        self.cache.store(d, [(0, 3, 'keyword')])
+        self.assertEqual(self.cache.lookup(d), [(0, 3, 'keyword')])
+
+    def test_digest(self):
+        self.assertNotEqual(highlight.digest('int a;', ['-x', 'c++']), highlight.digest('int a;', ['-x', 'c']))
+        self.assertNotEqual(highlight.digest('int a;', []), highlight.digest('int b;', []))
+
+    def test_cached_not_parsed(self):
+        text = 'int a;'
+        self.cache.store(highlight.digest(text, []), [(0, 3, 'keyword')])
+
+        # Without an index, parsing would fail
+        highlighter = ExampleHighlighter(None, [], self.cache)
+
+        self.assertEqual(highlighter.highlight([text, text]), {text: [(0, 3, 'keyword')]})
+
+    def test_classify(self):
+        tokens = [
+            (TokenKind.PUNCTUATION, CursorKind.INCLUSION_DIRECTIVE, '#', 0, 1, 0),
+            (TokenKind.IDENTIFIER, CursorKind.INCLUSION_DIRECTIVE, 'include', 1, 8, 0),
+            (TokenKind.PUNCTUATION, CursorKind.INCLUSION_DIRECTIVE, '<', 9, 10, 0),
+            (TokenKind.IDENTIFIER, CursorKind.INCLUSION_DIRECTIVE, 'a', 10, 11, 0),
+            (TokenKind.PUNCTUATION, CursorKind.INCLUSION_DIRECTIVE, '>', 11, 12, 0),
+            (TokenKind.KEYWORD, CursorKind.VAR_DECL, 'int', 13, 16, None),
+            (TokenKind.IDENTIFIER, CursorKind.VAR_DECL, 'a', 17, 18, None),
+            (TokenKind.COMMENT, CursorKind.INVALID_FILE, '// a', 20, 24, None),
+        ]
+
+        self.assertEqual(highlight.classify(tokens), [(0, 12, 'preprocessor'), (13, 16, 'keyword'),
+                                                      (20, 24, 'comment')])
+
+    def test_to_example(self):
+        # The offsets are in bytes
+        ex = highlight.to_example('é; int a;', [(4, 7, 'keyword')])
+
+        self.assertEqual([(item.text, item.classes) for item in ex],
+                         [('é; ', None), ('int', ['keyword']), (' a;', None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
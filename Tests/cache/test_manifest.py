@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Pydoc.cache.manifest import Manifest
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.source = self.write('a.cc', '#include "a.hh"\n')
+        self.header = self.write('a.hh', 'int a();\n')
+        self.other = self.write('b.cc', 'int b();\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory, name)
+
+        with open(path, 'w') as f:
+            f.write(content)
+
+        return path
+
+    def previous_run(self) -> None:
+        manifest = Manifest.load(self.directory)
+        manifest.record_source(self.source, ['-I/include'], [self.header])
+        manifest.record_source(self.other, ['-I/include'], [])
+        manifest.record_page('index.xml', 'digest')
+        manifest.record_page('A.xml', 'digest')
+        manifest.save()
+
+    def load(self) -> Manifest:
+        return Manifest.load(self.directory)
+
+    def test_first_run(self):
+        manifest = self.load()
+        self.assertTrue(manifest.is_affected(self.source, ['-I/include']))
+        self.assertFalse(manifest.record_page('index.xml', 'digest'))
+
+    def test_unchanged(self):
+        self.previous_run()
+        manifest = self.load()
+        self.assertFalse(manifest.is_affected(self.source, ['-I/include']))
+        self.assertFalse(manifest.is_affected(self.other, ['-I/include']))
+
+    def test_changed_header(self):
+        self.previous_run()
+        self.write('a.hh', 'int a(int);\n')
+        manifest = self.load()
+        self.assertTrue(manifest.is_affected(self.source, ['-I/include']))
+        self.assertFalse(manifest.is_affected(self.other, ['-I/include']))
+
+    def test_changed_flags(self):
+        self.previous_run()
+        manifest = self.load()
+        self.assertTrue(manifest.is_affected(self.other, ['-I/other']))
+
+    def test_pages(self):
+        self.previous_run()
+        manifest = self.load()
+        self.assertTrue(manifest.record_page('index.xml', 'digest'))
+        self.assertFalse(manifest.record_page('B.xml', 'digest'))
+        self.assertEqual(manifest.stale_pages(), ['A.xml'])
+
+    def test_restart(self):
+        manifest = self.load()
+        manifest.record_source(self.source, ['-I/include'], [self.header])
+        manifest.record_page('index.xml', 'digest')
+        manifest.restart()
+        self.assertFalse(manifest.is_affected(self.source, ['-I/include']))
+        self.assertTrue(manifest.record_page('index.xml', 'digest'))
+        self.assertEqual(manifest.stale_pages(), [])
+
+        manifest.record_source(self.source, ['-I/include'], [self.header])
+        self.write('a.hh', 'int a(int);\n')
+        manifest.restart()
+        self.assertTrue(manifest.is_affected(self.source, ['-I/include']))
+        self.assertEqual(manifest.stale_pages(), ['index.xml'])
+
+
+if __name__ == '__main__':
+    unittest.main()
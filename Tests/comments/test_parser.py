@@ -0,0 +1,44 @@
+import pickle
+import unittest
+
+from Pydoc.comments.parser import Parser
+
+
+class TestParser(unittest.TestCase):
+
+    def parse(self, s: str):
+        r = Parser.parse(s)
+
+        return (r.brief, [(p.name, p.description) for p in r.preparam], r.body,
+                [(p.name, p.description) for p in r.postparam])
+
+    def test_brief(self):
+        self.assertEqual(self.parse(''), ('', [], '', []))
+        self.assertEqual(self.parse('The brief.'), ('The brief.', [], '', []))
+        self.assertEqual(self.parse('\tA\tB'), ('        A       B', [], '', []))
+
+    def test_params(self):
+        self.assertEqual(self.parse('x\n@a b\n@c d\n'), ('x', [('a', 'b'), ('c', 'd')], '', []))
+        self.assertEqual(self.parse('x\n@return x'), ('x', [('return', 'x')], '', []))
+        self.assertEqual(self.parse('x\n @a b\n'), ('x', [('a', 'b')], '', []))
+        self.assertEqual(self.parse('x\n@ a b\n'), ('x', [('a', 'b')], '', []))
+
+    def test_param_continued(self):
+        self.assertEqual(self.parse('x\n@a b\nbody\n'), ('x', [('a', 'b\nbody')], '', []))
+        self.assertEqual(self.parse('x\n@a\nb\n'), ('x', [('a', 'b')], '', []))
+
+    def test_body(self):
+        self.assertEqual(self.parse('x\n\nbody\n@return r\n'), ('x', [], 'body\n', [('return', 'r')]))
+        self.assertEqual(self.parse('x\n\n  \n body\n  @x y\nz\n@q\n'),
+                         ('x', [], 'body\n  @x y\nz\n', [('q', '')]))
+        self.assertEqual(self.parse('\n\n @return x\tb'), ('', [], '', [('return', 'x      b')]))
+
+    def test_memo(self):
+        text = 'A function.\n@a the argument.\n\nLonger.\n\n@return a number.'
+
+        self.assertIs(Parser.parse(text), Parser.parse(text))
+        self.assertEqual(pickle.loads(pickle.dumps(Parser.parse(text))).postparam[0].description, 'a number.')
+
+
+if __name__ == '__main__':
+    unittest.main()
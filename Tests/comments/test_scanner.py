@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Pydoc.comments import scanner
+
+INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'input')
+
+
+class TestScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, content: str) -> str:
+        path = os.path.join(self.directory, 'a.hh')
+
+        with open(path, 'w') as f:
+            f.write(content)
+
+        return path
+
+    def scan(self, content: str):
+        return [(token.location.offset, text) for token, text in scanner.scan(self.write(content))]
+
+    def texts(self, name: str):
+        return [text for token, text in scanner.scan(os.path.join(INPUT, name))]
+
+    def test_inputs(self):
+        self.assertEqual(self.texts('base.hh'), ["A b method.\n\nThe b method description.\n",
+                                                 "\nThe class A.\n\nA longer description of A.\n",
+                                                 "@inherit"])
+        self.assertEqual(self.texts('namespace.hh')[4:], ["E_1 value.", "E_2 value."])
+        self.assertEqual(self.texts('utf8.hh'), ["Copyright ©"])
+
+    def test_location(self):
+        content = "int x;\n\n// The a function.\nint a();\n"
+        token, text = next(scanner.scan(self.write(content)))
+
+        self.assertEqual(text, "The a function.")
+        self.assertEqual(token.location.offset, content.index('int a'))
+        self.assertEqual((token.location.line, token.location.column), (4, 1))
+
+    def test_adjacency(self):
+        content = "// dropped\n\n// first\n/* second */\nint a;\n"
+        self.assertEqual(self.scan(content), [(content.index('int'), "first\nsecond")])
+
+    def test_token_ends_run(self):
+        content = "// a\nint a; // b\nint b;\n"
+        self.assertEqual(self.scan(content), [(content.index('int a'), "a"), (content.index('int b'), "b")])
+
+    def test_hidden(self):
+        content = "// a\n//- hidden\n// b\nint a;\n"
+        self.assertEqual(self.scan(content), [(content.index('int'), "a\nb")])
+
+    def test_end_of_file(self):
+        self.assertEqual(self.scan("int a;\n// trailing\n"), [])
+        self.assertEqual(self.scan(""), [])
+
+    def test_instruction(self):
+        content = "// dropped\n// Pydoc:begin-category(A)\n// a\nint a;\n"
+        result = self.scan(content)
+
+        self.assertEqual(result, [(content.index('//', 1), "Pydoc:begin-category(A)"), (content.index('int'), "a")])
+
+    def test_literals(self):
+        content = ('const char *s = "/* no */ // no";\n'
+                   "char c = '\"'; // c\n"
+                   "int n = 1'000'000; // n\n"
+                   'const char *r = R"x(// no )" */ )x"; // r\n'
+                   'const char *p = u8R"(/* no)"; // p\n'
+                   "int x;\n")
+        self.assertEqual([text for offset, text in self.scan(content)], ["c", "n", "r", "p"])
+
+    def test_continued_line_comment(self):
+        content = "// a \\\nstill a\nint a;\n"
+        self.assertEqual(self.scan(content), [(content.index('int'), "a \\\nstill a")])
+
+    def test_line_splice(self):
+        # The splices right before a comment are part of it, like in the
+        # libclang tokens, so the comment starts on the line of the backslash
+        content = "int a; \\\n// b\nint b;\n"
+        self.assertEqual(self.scan(content), [(content.index('int b'), "b")])
+
+        content = "// a\n\\\n\\\n// b\nint b;\n"
+        self.assertEqual(self.scan(content), [(content.index('int'), "a\nb")])
+
+        # Followed by whitespace they are whitespace
+        content = "// a\n\\\n\\\n  // b\nint b;\n"
+        self.assertEqual(self.scan(content), [(content.index('int'), "b")])
+
+        # Right before a token they are part of the token
+        content = "// a\n/* b */\\\nint b;\n"
+        self.assertEqual(self.scan(content), [(content.index('\\'), "a\nb")])
+
+        self.assertEqual(scanner.clean_comment("\\\n// b", 7), "b")
+        self.assertEqual(scanner.clean_comment("\\\n/*\n * b\n */", 7), "\nb\n")
+
+    def test_line_splice_in_markers(self):
+        content = "int x;\n/\\\n* c */\nint a;\n"
+        self.assertEqual(self.scan(content), [(content.index('int a'), "c")])
+
+        content = "/\\\n/ c\nint a;\n"
+        self.assertEqual(self.scan(content), [(content.index('int a'), "c")])
+
+        # The comment ends at the first terminator
+        content = "/* s *\\\n/\nint a;\n/* t */\nint b;\n"
+        self.assertEqual(self.scan(content), [(content.index('int a'), "s"), (content.index('int b'), "t")])
+
+        # Like in libclang, only one line splice can split the terminator,
+        # the comment ends at the next one
+        content = "/* s *\\\n\\\n/\nint a;\n/* t */\nint b;\n"
+        self.assertEqual(self.scan(content), [(content.index('int b'), " s *\\\n\\\n/\nint a;\n/* t")])
+
+    def test_block_indentation(self):
+        content = "\t/* A.\n\t *\n\t * B.\n\t */\n\tint a;\n"
+        self.assertEqual(self.scan(content), [(content.index('int'), "A.\n\nB.\n")])
+
+    def test_instructions_only(self):
+        content = "// a\nint a;\n// Pydoc:begin-category(A)\n// b\nint b;\n"
+        path = self.write(content)
+
+        self.assertEqual([text for token, text in scanner.scan(path, instructions_only=True)],
+                         ["Pydoc:begin-category(A)"])
+
+    def test_raw_comment(self):
+        self.assertEqual(scanner.clean_raw_comment("// a\n\t// b", 2), "a\nb")
+        self.assertEqual(scanner.clean_raw_comment("/* A.\n\t *\n\t * B.\n\t */", 2), "A.\n\nB.\n")
+        self.assertEqual(scanner.clean_raw_comment("//- hidden", 1), None)
+        self.assertEqual(scanner.clean_raw_comment("// Pydoc:end-category()\n// a", 1), "a")
+
+
+if __name__ == '__main__':
+    unittest.main()
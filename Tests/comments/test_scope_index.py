@@ -0,0 +1,85 @@
+import random
+import re
+import unittest
+
+from Nodes.node import Node
+from Pydoc.scopeindex import ScopeIndex, literal_prefix
+
+
+class Scope(object):
+    """
+    A node with the attributes used for resolving names.
+    """
+    resolve_nodes = Node.resolve_nodes
+
+    def __init__(self, name: str, children=(), bases=()):
+        self.name = name
+        self.children = list(children)
+        self.bases = list(bases)
+
+    @property
+    def direct_resolve_nodes(self):
+        return iter(self.children)
+
+    @property
+    def inherited_scopes(self):
+        return iter(self.bases)
+
+
+class TestScopeIndex(unittest.TestCase):
+
+    def expected(self, node, name: str):
+        return [child for child in node.resolve_nodes if child.name == name]
+
+    def test_inherited(self):
+        base = Scope('Base', [Scope('f'), Scope('g')])
+        derived = Scope('Derived', [Scope('f'), Scope('h')], [base])
+        index = ScopeIndex()
+
+        self.assertEqual(index.lookup(derived, 'f'), [derived.children[0], base.children[0]])
+        self.assertEqual(index.lookup(derived, 'g'), [base.children[1]])
+        self.assertEqual(index.lookup(derived, 'Base'), [base])
+        self.assertEqual(index.lookup(derived, 'x'), [])
+        self.assertEqual(index.lookup(base, 'h'), [])
+
+    def test_random(self):
+        rnd = random.Random(18)
+        names = ['a', 'b', 'ab', 'abc', 'ba', 'c', '']
+        patterns = [re.compile(p) for p in ['a', 'ab?', 'b|c', '.*c', 'a.', 'abc', 'x', '(?i)A']]
+
+        for _ in range(200):
+            scopes = []
+
+            for i in range(8):
+                children = [Scope(rnd.choice(names)) for _ in range(rnd.randrange(4))]
+                bases = rnd.sample(scopes, rnd.randrange(min(3, len(scopes) + 1)))
+                scopes.append(Scope(rnd.choice(names), children, bases))
+
+            index = ScopeIndex()
+
+            for scope in reversed(scopes):
+                for name in names:
+                    self.assertEqual(index.lookup(scope, name), self.expected(scope, name))
+
+                for pattern in patterns:
+                    self.assertEqual(index.match(scope, pattern),
+                                     [child for child in scope.resolve_nodes if pattern.match(child.name)])
+
+    def test_literal_prefix(self):
+        self.assertEqual(literal_prefix(re.compile('get_.*')), 'get_')
+        self.assertEqual(literal_prefix(re.compile('gets?')), 'get')
+        self.assertEqual(literal_prefix(re.compile('ab{2}')), 'a')
+        self.assertEqual(literal_prefix(re.compile('a|b')), '')
+        self.assertEqual(literal_prefix(re.compile('(?i)abc')), '')
+        self.assertEqual(literal_prefix(re.compile('abc', re.I)), '')
+        self.assertEqual(literal_prefix(re.compile('a')), 'a')
+
+    def test_cycle(self):
+        a = Scope('A', [Scope('f')])
+        a.bases.append(a)
+
+        self.assertEqual(ScopeIndex().lookup(a, 'f'), [a.children[0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import random
+import unittest
+
+from Pydoc.comments.range_map import RangeMap
+from Pydoc.comments.sorted import Sorted
+
+
+class TestSorted(unittest.TestCase):
+    def setUp(self):
+        r = random.Random(4)
+        self.items = [(r.randrange(50), i) for i in range(300)]
+
+    def test_insert_all(self):
+        for right in (False, True):
+            one = Sorted(key=lambda x: x[0])
+            bulk = Sorted(key=lambda x: x[0])
+
+            for item in self.items:
+                if right:
+                    one.insert_right(item)
+                else:
+                    one.insert(item)
+
+            bulk.insert_all(self.items[:100], right)
+            bulk.insert_all(self.items[100:], right)
+
+            self.assertEqual(list(bulk), list(one))
+            self.assertEqual(bulk.keys, one.keys)
+            self.assertEqual(bulk.find(self.items[0][0]), one.find(self.items[0][0]))
+
+
+class TestRangeMap(unittest.TestCase):
+    @staticmethod
+    def linear(ranges, i):
+        found = None
+
+        for obj, start, end in sorted(ranges, key=lambda r: r[1]):
+            if start <= i <= end:
+                found = obj
+
+        return found
+
+    def test_find(self):
+        r = random.Random(7)
+        ranges = []
+        m = RangeMap()
+
+        for n in range(200):
+            start = r.randrange(1000)
+            ranges.append((n, start, start + r.randrange(100)))
+
+        for obj, start, end in ranges[:150]:
+            m.insert(obj, start, end)
+
+        for i in range(0, 1100, 3):
+            self.assertEqual(m.find(i), self.linear(ranges[:150], i))
+
+        # Inserting after looking up rebuilds the tree
+        m.insert_all((RangeMap.Item(obj=obj, start=start, end=end) for obj, start, end in ranges[150:]), right=True)
+
+        for i in range(0, 1100, 3):
+            self.assertEqual(m.find(i), self.linear(ranges, i))
+
+    def test_nested(self):
+        m = RangeMap()
+        m.push('outer', 0)
+        m.push('inner', 10)
+        m.pop(20)
+        m.pop(30)
+
+        self.assertEqual(m.find(5), 'outer')
+        self.assertEqual(m.find(15), 'inner')
+        self.assertEqual(m.find(25), 'outer')
+        self.assertIsNone(m.find(31))
+        self.assertIsNone(RangeMap().find(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Pydoc import fs
+
+
+class TestWriteIfChanged(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'page.xml')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        fs.Virtual.clear()
+
+    def read(self) -> str:
+        with open(self.path) as f:
+            return f.read()
+
+    def test_system(self):
+        self.assertTrue(fs.System.write_if_changed(self.path, 'a\n'))
+        mtime = os.stat(self.path).st_mtime_ns
+        os.utime(self.path, ns=(mtime - 10 ** 9, mtime - 10 ** 9))
+
+        self.assertFalse(fs.System.write_if_changed(self.path, 'a\n'))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, mtime - 10 ** 9)
+
+        self.assertTrue(fs.System.write_if_changed(self.path, 'b\n'))
+        self.assertEqual(self.read(), 'b\n')
+        self.assertEqual(os.listdir(self.directory), ['page.xml'])
+
+    def test_system_replace(self):
+        tmp = self.path + '.tmp'
+
+        for content, replaced in [('a', True), ('a', False), ('ab', True)]:
+            with open(tmp, 'w') as f:
+                f.write(content)
+
+            self.assertEqual(fs.System.replace_if_changed(tmp, self.path), replaced)
+            self.assertEqual(self.read(), content)
+            self.assertFalse(os.path.exists(tmp))
+
+    def test_virtual(self):
+        self.assertTrue(fs.Virtual.write_if_changed(self.path, 'a'))
+        self.assertFalse(fs.Virtual.write_if_changed(self.path, 'a'))
+        self.assertTrue(fs.Virtual.write_if_changed(self.path, 'b'))
+        self.assertEqual(fs.Virtual.open(self.path).read(), 'b')
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+from Pydoc.generators.dispatch import Dispatch
+
+
+class Node(object):
+    pass
+
+
+class Struct(Node):
+    pass
+
+
+class Class(Struct):
+    pass
+
+
+class Mixin(object):
+    pass
+
+
+class Interface(Class, Mixin):
+    pass
+
+
+class Property(Node):
+    pass
+
+
+class Generator(object):
+    def struct_to_xml(self, node, elem):
+        elem.append('struct')
+
+    def mixin_to_xml(self, node, elem):
+        elem.append('mixin')
+
+    def class_to_xml_ref(self, node, elem):
+        elem.append('class ref')
+
+    def node_to_xml(self, node, elem):
+        # Never called, the lookup stops at Node
+        elem.append('node')
+
+
+class Html(Generator):
+    def class_to_xml(self, node, elem):
+        elem.append('html class')
+
+
+class TestDispatch(unittest.TestCase):
+
+    def call(self, dispatch, generator, node, fn):
+        elem = []
+        handler = dispatch.lookup(type(generator), type(node), fn)
+
+        if handler is not None:
+            handler(generator, node, elem)
+
+        return elem
+
+    def test_bases(self):
+        dispatch = Dispatch(Node)
+        generator = Generator()
+
+        # Breadth first, Mixin comes before Struct
+        self.assertEqual(self.call(dispatch, generator, Interface(), 'to_xml'), ['mixin'])
+        self.assertEqual(self.call(dispatch, generator, Class(), 'to_xml'), ['struct'])
+        self.assertEqual(self.call(dispatch, generator, Interface(), 'to_xml_ref'), ['class ref'])
+        self.assertEqual(self.call(dispatch, generator, Struct(), 'to_xml_ref'), [])
+        self.assertEqual(self.call(dispatch, generator, Node(), 'to_xml'), [])
+        self.assertEqual(self.call(dispatch, Html(), Class(), 'to_xml'), ['html class'])
+
+    def test_register(self):
+        dispatch = Dispatch(Node)
+        generator = Generator()
+
+        self.assertEqual(self.call(dispatch, generator, Property(), 'to_xml'), [])
+
+        dispatch.register(Property, 'to_xml', lambda g, node, elem: elem.append('property'))
+        dispatch.register(Class, 'to_xml', lambda g, node, elem: elem.append('gobject class'))
+
+        self.assertEqual(self.call(dispatch, generator, Property(), 'to_xml'), ['property'])
+        self.assertEqual(self.call(dispatch, generator, Interface(), 'to_xml'), ['gobject class'])
+        self.assertEqual(self.call(dispatch, generator, Struct(), 'to_xml'), ['struct'])
+        # Registered handlers come before the methods
+        self.assertEqual(self.call(dispatch, Html(), Class(), 'to_xml'), ['gobject class'])
+
+
+if __name__ == '__main__':
+    unittest.main()
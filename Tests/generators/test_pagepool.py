@@ -0,0 +1,37 @@
+import os
+import unittest
+
+from Pydoc.generators import pagepool
+from Pydoc.generators.pagepool import PagePool, PageResult
+
+
+class Generator(object):
+    """
+    Renders the pages of the nodes (numbers) in a worker, without being
+    picklable.
+    """
+
+    def __init__(self):
+        self.unpicklable = lambda: None
+
+    def render_page(self, node) -> PageResult:
+        result = PageResult('{}.xml'.format(node))
+        # The process rendering the page
+        result.digest = str(os.getpid())
+
+        return result
+
+
+@unittest.skipUnless(pagepool.available(), 'requires forking')
+class TestPagePool(unittest.TestCase):
+
+    def test_order(self):
+        results = list(PagePool(Generator(), range(100), 4))
+
+        self.assertEqual([r.filename for r in results], ['{}.xml'.format(i) for i in range(100)])
+        # Rendered in the workers
+        self.assertNotIn(str(os.getpid()), [r.digest for r in results])
+
+
+if __name__ == '__main__':
+    unittest.main()
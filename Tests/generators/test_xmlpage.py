@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Pydoc.generators.xml import Xml, XmlPage
+
+
+class Root(object):
+    comment = None
+
+    def sorted_children(self):
+        return [None]
+
+
+class Tree(object):
+    root = Root()
+    manifest = None
+
+
+class Failing(Xml):
+    """
+    Raises while generating the nodes, after the index has been opened.
+    """
+
+    def generate_node(self, node):
+        raise RuntimeError('generate_node')
+
+
+class TestXmlPage(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_discard_unfinished(self):
+        page = XmlPage('index.xml', os.path.join(self.directory, 'index.xml'), stream=True)
+        page.write('<index>')
+        page.discard()
+
+        self.assertTrue(page._out.closed)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_generate_error(self):
+        generator = Failing(Tree())
+
+        with self.assertRaises(RuntimeError):
+            generator.generate(self.directory)
+
+        self.assertTrue(generator.index._out.closed)
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
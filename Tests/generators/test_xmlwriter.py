@@ -0,0 +1,110 @@
+import io
+import random
+import unittest
+from xml.etree import ElementTree
+from xml.etree.ElementTree import Element
+
+from Pydoc.generators.xmlwriter import XmlWriter
+
+
+def indent(elem, level=0):
+    # The indentation done by the Xml generator before the writer
+    i = "\n" + "  " * level
+
+    if elem.tag == 'doc':
+        return
+
+    if len(elem):
+        if not elem.text or not elem.text.strip():
+            elem.text = i + "  "
+
+        for e in elem:
+            indent(e, level + 1)
+
+            if not e.tail or not e.tail.strip():
+                e.tail = i + "  "
+        if not e.tail or not e.tail.strip():
+            e.tail = i
+    else:
+        if level and (not elem.tail or not elem.tail.strip()):
+            elem.tail = i
+
+
+def serialize(elem: Element) -> str:
+    elem.attrib['xmlns'] = 'ns'
+    indent(elem)
+
+    content = io.StringIO()
+    ElementTree.ElementTree(elem).write(content, encoding='unicode', xml_declaration=True)
+
+    return content.getvalue()
+
+
+class TestXmlWriter(unittest.TestCase):
+    texts = [None, None, '', ' ', '\n  ', 'x', ' a<b & "c" ', '\n']
+
+    def random_element(self, rnd: random.Random, depth: int) -> Element:
+        elem = Element(rnd.choice(['a', 'b', 'doc', 'ref', 'brief']))
+
+        for name in rnd.sample(['name', 'id', 'ref'], rnd.randrange(3)):
+            elem.set(name, rnd.choice(['x', 'a<b', '"q" & \n']))
+
+        elem.text = rnd.choice(self.texts)
+
+        if depth < 4:
+            for _ in range(rnd.choice([0, 0, 1, 2, 3])):
+                child = self.random_element(rnd, depth + 1)
+                child.tail = rnd.choice(self.texts)
+                elem.append(child)
+
+        return elem
+
+    def stream(self, writer: XmlWriter, elem: Element, rnd: random.Random):
+        if rnd.random() < 0.5:
+            writer.element(elem)
+            return
+
+        # Open the element with some of its children, write the others
+        children = list(elem)
+        first = rnd.randrange(len(children) + 1)
+        opened = Element(elem.tag, elem.attrib)
+        opened.text = elem.text
+        opened.tail = elem.tail
+        opened.extend(children[:first])
+
+        writer.start(opened)
+
+        for child in children[first:]:
+            self.stream(writer, child, rnd)
+
+        writer.end()
+
+    def test_identical(self):
+        rnd = random.Random(22)
+
+        for _ in range(2000):
+            elem = self.random_element(rnd, 0)
+            elem.tail = None
+
+            content = io.StringIO()
+            writer = XmlWriter(content.write, xmlns='ns')
+            self.stream(writer, elem, rnd)
+            writer.close()
+
+            self.assertEqual(content.getvalue(), serialize(elem))
+
+    def test_unindented(self):
+        elem = ElementTree.fromstring('<a x="1"><b>t</b> <c /><doc>d <e /></doc></a>')
+
+        content = io.StringIO()
+        writer = XmlWriter(content.write, pretty=False)
+        writer.element(elem)
+
+        expected = io.StringIO()
+        ElementTree.ElementTree(elem).write(expected, encoding='unicode', xml_declaration=True)
+
+        self.assertEqual(content.getvalue(), expected.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from Nodes import method
+from Pydoc import cmdgenerate
+
+INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'input')
+
+
+class TestFastParse(unittest.TestCase):
+    """
+    Skipping the function bodies must not change the documentation, the
+    methods defined inline are not abstract.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def generate(self, header, options):
+        output = os.path.join(self.directory, os.path.splitext(header)[0] + ''.join(options))
+        os.mkdir(output)
+
+        cmdgenerate.run(['--', '--quiet', '--type', 'xml', '--output', output] + options +
+                        ['--files', os.path.join(INPUT, header)])
+
+        pages = {}
+
+        for page in os.listdir(os.path.join(output, 'xml')):
+            with open(os.path.join(output, 'xml', page)) as f:
+                pages[page] = f.read()
+
+        return pages
+
+    def test_same_xml(self):
+        for header in ['abstract.hh', 'base.hh', 'class.hh', 'constructor.hh', 'destructor.hh', 'interface.hh',
+                       'method.hh', 'virtual.hh']:
+            with self.subTest(header=header):
+                default = self.generate(header, [])
+                fast = self.generate(header, ['--fast-parse'])
+
+                self.assertTrue(default)
+                self.assertEqual(fast, default)
+
+    def test_default_no_token_scan(self):
+        # Only the declarations of a translation unit parsed without the
+        # bodies need to look for one in the tokens
+        with mock.patch.object(method, 'has_skipped_body', wraps=method.has_skipped_body) as scan:
+            self.generate('method.hh', [])
+            self.assertEqual(scan.call_count, 0)
+
+            self.generate('method.hh', ['--fast-parse'])
+            self.assertGreater(scan.call_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import random
+import unittest
+
+from Nodes.cclass import Class
+
+
+class Base(object):
+    def __init__(self, node):
+        self.node = node
+
+
+class FakeClass(object):
+    """
+    A class with the attributes used for finding the overridden methods.
+    """
+    find_overrides = Class.find_overrides
+
+    def __init__(self, methods, bases=()):
+        self.name_to_method = {name: (self, name) for name in methods}
+        self.bases = [Base(b) for b in bases]
+
+
+def expected(cls, name):
+    # The lookup done by Method.override before the table
+    bases = list(cls.bases)
+    ret = []
+
+    while len(bases) > 0:
+        b = bases[0]
+        bases = bases[1:]
+
+        if not b.node:
+            continue
+
+        b = b.node
+
+        if name in b.name_to_method:
+            ret.append(b.name_to_method[name])
+        else:
+            bases = bases + b.bases
+
+    return ret
+
+
+class TestOverrides(unittest.TestCase):
+
+    def test_breadth_first(self):
+        a1 = FakeClass(['f'])
+        a = FakeClass([], [a1])
+        b = FakeClass(['f', 'g'])
+        c = FakeClass(['f', 'g', 'h'], [a, None, b])
+
+        self.assertEqual(c.find_overrides(['f', 'g', 'h']), {'f': [(b, 'f'), (a1, 'f')], 'g': [(b, 'g')]})
+
+    def test_random(self):
+        rnd = random.Random(21)
+        names = ['f', 'g', 'h', 'i']
+
+        for _ in range(300):
+            classes = []
+
+            for i in range(10):
+                methods = rnd.sample(names, rnd.randrange(len(names)))
+                bases = rnd.sample(classes, rnd.randrange(min(3, len(classes) + 1)))
+                classes.append(FakeClass(methods, bases))
+
+            for cls in classes:
+                found = cls.find_overrides(names)
+
+                for name in names:
+                    self.assertEqual(found.get(name, []), expected(cls, name))
+
+
+if __name__ == '__main__':
+    unittest.main()
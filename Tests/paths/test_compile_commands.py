@@ -0,0 +1,24 @@
+import unittest
+
+from Pydoc.files.compile_commands import _command_flags
+
+
+class MyTestCase(unittest.TestCase):
+    def test_command_flags(self):
+        arguments = ['/usr/bin/c++', '-DNDEBUG', '-Iinclude', '-std=c++17', '-o', 'a.o', '-c', '../src/a.cc']
+        flags = _command_flags(arguments, '/project/build', '/project/src/a.cc')
+        self.assertEqual(flags, ['-working-directory', '/project/build', '-DNDEBUG', '-Iinclude', '-std=c++17'])
+
+    def test_command_flags_dependencies(self):
+        arguments = ['cc', '-MD', '-MT', 'a.o', '-MF', 'a.o.d', '-c', '/project/a.c', '-o', 'a.o']
+        flags = _command_flags(arguments, '/project', '/project/a.c')
+        self.assertEqual(flags, ['-working-directory', '/project'])
+
+    def test_command_flags_other_file(self):
+        arguments = ['cc', '-include', 'config.h', '-c', 'a.c']
+        flags = _command_flags(arguments, '/project', '/project/a.c')
+        self.assertEqual(flags, ['-working-directory', '/project', '-include', 'config.h'])
+
+
+if __name__ == '__main__':
+    unittest.main()
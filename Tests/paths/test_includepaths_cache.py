@@ -0,0 +1,62 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from Pydoc.files import includepaths
+
+COMPILER = """#!/bin/sh
+echo run >> {count}
+echo '#include <...> search starts here:' >&2
+echo ' /usr/include' >&2
+echo ' /Library/Frameworks (framework directory)' >&2
+echo 'End of search list.' >&2
+"""
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.count = os.path.join(self.directory, 'count')
+        self.cache_file = os.path.join(self.directory, 'cache', 'includepaths.json')
+        self.path = os.environ.get('PATH', '')
+
+        compiler = os.path.join(self.directory, 'clang++')
+
+        with open(compiler, 'w') as f:
+            f.write(COMPILER.format(count=self.count))
+
+        os.chmod(compiler, os.stat(compiler).st_mode | stat.S_IEXEC)
+        os.environ['PATH'] = self.directory
+
+    def tearDown(self):
+        os.environ['PATH'] = self.path
+        shutil.rmtree(self.directory)
+
+    def runs(self) -> int:
+        if not os.path.exists(self.count):
+            return 0
+
+        with open(self.count) as f:
+            return len(f.readlines())
+
+    def test_cached(self):
+        expected = ['-I/usr/include', '-I/Library/Frameworks']
+        self.assertEqual(includepaths.flags('-fPIC', self.cache_file), expected)
+        self.assertEqual(includepaths.flags('-fPIC', self.cache_file), expected)
+        self.assertEqual(self.runs(), 1)
+
+    def test_include_paths_in_key(self):
+        includepaths.flags('-I/home/path/directory', self.cache_file)
+        includepaths.flags('-I/dev/path/directory', self.cache_file)
+        self.assertEqual(self.runs(), 2)
+
+    def test_refresh(self):
+        includepaths.flags('', self.cache_file)
+        includepaths.flags('', self.cache_file, refresh=True)
+        self.assertEqual(self.runs(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import pickle
+import unittest
+
+from Clang.kinds.access_specifier import AccessSpecifier
+from Clang.kinds.cursor_kind import CursorKind
+from Pydoc.comments.comment import Comment
+from Pydoc.snapshot import CursorSnapshot
+from Pydoc.util.location import Location
+
+
+def roundtrip(obj):
+    return pickle.loads(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+
+
+def make_cursor(offset: int = 10, filename: str = '/src/a.hh') -> CursorSnapshot:
+    location = Location(filename, 2, 1, offset)
+    extent = CursorSnapshot.Extent(location, Location(filename, 4, 2, offset + 20))
+    return CursorSnapshot(CursorKind.CLASS_DECL, 'A', 'A', 'c:@S@A', location, extent)
+
+
+class MyTestCase(unittest.TestCase):
+    def test_enumeration_identity(self):
+        self.assertIs(roundtrip(CursorKind.CLASS_DECL), CursorKind.CLASS_DECL)
+        self.assertIs(roundtrip(AccessSpecifier.PROTECTED), AccessSpecifier.PROTECTED)
+
+    def test_cursor_equality(self):
+        self.assertEqual(make_cursor(), make_cursor())
+        self.assertNotEqual(make_cursor(), make_cursor(offset=30))
+        self.assertEqual(len({make_cursor(): 1, make_cursor(): 2}), 1)
+
+    def test_cursor_roundtrip(self):
+        cursor = make_cursor()
+        cursor.semantic_parent = make_cursor(offset=0, filename='/src/ns.hh')
+        copy = roundtrip({cursor: 'node'})
+
+        key = next(iter(copy))
+        self.assertEqual(key, cursor)
+        self.assertEqual(copy[cursor], 'node')
+        self.assertEqual(key.semantic_parent, cursor.semantic_parent)
+        self.assertEqual(str(key.extent.end.file), '/src/a.hh')
+
+    def test_comment_components(self):
+        example = Comment.Example('    int a;\n    int b;')
+        reference = Comment.UnresolvedReference('a_b')
+
+        self.assertEqual(roundtrip(example), example)
+        self.assertEqual(roundtrip(reference), reference)
+        self.assertEqual(roundtrip(reference).orig, 'a_b')
+
+    def test_comment(self):
+        comment = Comment('Brief.', Location('/src/a.hh', 1, 1, 0))
+        copy = roundtrip(comment)
+
+        self.assertEqual(str(copy.doc), 'Brief.')
+        self.assertEqual(copy.location.offset, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
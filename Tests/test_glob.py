@@ -1,3 +1,6 @@
+import os
+import shutil
+import tempfile
 import unittest
 
 from Pydoc.files.provider_source import ProviderSource
@@ -38,6 +41,24 @@ class MyTestCase(unittest.TestCase):
             # Only verified the first file
             break
 
+    def make_sources(self) -> str:
+        directory = os.path.realpath(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        os.makedirs(os.path.join(directory, 'include', 'detail'))
+
+        for name in ('include/a.hh', 'include/detail/b.hh', 'c.cc'):
+            with open(os.path.join(directory, name), 'w') as f:
+                f.write('\n')
+
+        return directory
+
+    def test_contains(self):
+        directory = self.make_sources()
+        sources = ProviderSource(os.path.join(directory, '**'))
+        self.assertTrue(os.path.join(directory, 'include', 'a.hh') in sources)
+        self.assertTrue(os.path.join(directory, 'include', '..', 'c.cc') in sources)
+        self.assertFalse(os.path.join(directory, 'd.cc') in sources)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,104 @@
+import os
+import shutil
+import socket
+import stat
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from Pydoc import cmddaemon, cmdgenerate
+from Pydoc.cmddaemon import Daemon
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output = os.path.join(self.directory, 'out')
+        self.daemon = Daemon()
+
+        os.mkdir(self.output)
+        self.write('a.hh', 'class A {};\n')
+
+    def tearDown(self):
+        self.daemon.stop()
+        shutil.rmtree(self.directory)
+
+    def write(self, name, content):
+        with open(os.path.join(self.directory, name), 'w') as f:
+            f.write(content)
+
+    def args(self):
+        return ['--', '--quiet', '--type', 'xml', '--output', self.output,
+                '--files', os.path.join(self.directory, '*.hh')]
+
+    def generate(self):
+        response = self.daemon.handle({'command': 'generate', 'cwd': self.directory, 'args': self.args()})
+
+        self.assertEqual(response['status'], 0, response['stderr'])
+
+        return sorted(os.listdir(os.path.join(self.output, 'xml')))
+
+    def test_added_file(self):
+        self.assertEqual(self.generate(), ['A.xml', 'index.xml'])
+
+        self.write('b.hh', 'class B {};\n')
+
+        self.assertEqual(self.generate(), ['A.xml', 'B.xml', 'index.xml'])
+        self.assertEqual(len(self.daemon.sessions), 1)
+
+        os.unlink(os.path.join(self.directory, 'a.hh'))
+
+        self.assertEqual(self.generate(), ['B.xml', 'index.xml'])
+
+    def test_quiet_restores_stdout(self):
+        stdout = sys.stdout
+
+        for _ in range(3):
+            cmdgenerate.run(self.args(), daemon=self.daemon)
+
+        self.assertIs(sys.stdout, stdout)
+        self.assertFalse(stdout.closed)
+
+
+    def test_default_socket(self):
+        environ = {k: v for k, v in os.environ.items() if k != 'XDG_RUNTIME_DIR'}
+
+        with mock.patch.dict(os.environ, environ, clear=True), mock.patch.object(tempfile, 'tempdir', self.directory):
+            path = cmddaemon.default_socket()
+            directory = os.path.dirname(path)
+
+            self.assertEqual(os.path.dirname(directory), self.directory)
+            self.assertEqual(stat.S_IMODE(os.stat(directory).st_mode), 0o700)
+
+            # Readable by the other users
+            os.chmod(directory, 0o755)
+
+            with self.assertRaises(SystemExit):
+                cmddaemon.default_socket()
+
+    def test_listen(self):
+        path = os.path.join(self.directory, 'pydoc.sock')
+
+        # Left behind by a daemon that was killed
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.bind(path)
+
+        # Not removed if it belongs to another user
+        with mock.patch.object(os, 'getuid', return_value=os.stat(path).st_uid + 1):
+            with self.assertRaises(SystemExit):
+                cmddaemon._remove_stale(path)
+
+        self.assertTrue(os.path.exists(path))
+
+        cmddaemon._remove_stale(path)
+        server = cmddaemon.listen(path, self.daemon)
+
+        try:
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode) & 0o077, 0)
+        finally:
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Clang.exceptions.translation_unit import TranslationUnitLoadError
+from Pydoc.files.provider_source import ProviderSource
+from Pydoc.tree import Tree
+from Pydoc.watch import Watcher
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.pattern = os.path.join(self.directory, '*.hh')
+        self.generated = []
+
+        self.write('a.hh', 'class A {};\n')
+        self.write('b.hh', 'class B {};\n')
+
+        self.watcher = Watcher(self.create_tree, self.generate, [], files=lambda: list(ProviderSource(self.pattern)))
+
+    def tearDown(self):
+        self.watcher.close()
+        shutil.rmtree(self.directory)
+
+    def write(self, name, content):
+        with open(os.path.join(self.directory, name), 'w') as f:
+            f.write(content)
+
+    def create_tree(self) -> Tree:
+        return Tree(ProviderSource(self.pattern), ' -xc++')
+
+    def generate(self, tree: Tree):
+        tree.cross_ref()
+        self.generated.append(sorted(node.name for node in tree.root.children))
+
+    def parsed(self):
+        return sorted(os.path.basename(f) for f in self.watcher.translation_units)
+
+    def test_added_and_removed(self):
+        self.assertTrue(self.watcher.update())
+        self.assertEqual(self.generated[-1], ['A', 'B'])
+
+        os.unlink(os.path.join(self.directory, 'b.hh'))
+
+        self.assertTrue(self.watcher.update())
+        self.assertEqual(self.generated[-1], ['A'])
+        self.assertEqual(self.parsed(), ['a.hh'])
+
+        self.write('c.hh', 'class C {};\n')
+
+        self.assertTrue(self.watcher.update())
+        self.assertEqual(self.generated[-1], ['A', 'C'])
+        self.assertEqual(self.parsed(), ['a.hh', 'c.hh'])
+
+        self.assertFalse(self.watcher.update())
+
+    def during_first_build(self, edit):
+        generate = self.generate
+
+        def first(tree: Tree):
+            edit()
+            self.watcher.generate = generate
+            generate(tree)
+
+        self.watcher.generate = first
+
+        self.assertTrue(self.watcher.update())
+
+    def test_saved_during_first_build(self):
+        self.write('inc.h', 'class I {};\n')
+        self.write('a.hh', '#include "inc.h"\nclass A {};\n')
+
+        def edit():
+            self.write('inc.h', 'class I {};\nclass J {};\n')
+            self.write('b.hh', 'class B {};\nclass C {};\n')
+
+        self.during_first_build(edit)
+        self.assertEqual(self.generated[-1], ['A', 'B'])
+
+        changed, markdown = self.watcher.changes()
+        self.assertEqual(sorted(os.path.basename(f) for f in changed), ['b.hh', 'inc.h'])
+        self.assertFalse(markdown)
+
+    def test_merged_saved_during_first_build(self):
+        self.write('a.md', '#<cldoc:A>\n')
+        self.watcher.merge = [os.path.join(self.directory, 'a.md')]
+
+        self.during_first_build(lambda: self.write('a.md', '#<cldoc:A>\nA.\n'))
+
+        self.assertTrue(self.watcher.update())
+        self.assertFalse(self.watcher.update())
+
+    def test_reparse_removed(self):
+        self.watcher.update()
+
+        tree = self.watcher.tree
+        path = os.path.join(self.directory, 'b.hh')
+        os.unlink(path)
+
+        with self.assertRaises(TranslationUnitLoadError):
+            tree.parse_file(path, tree.file_flags(path), True)
+
+        self.assertEqual(self.parsed(), ['a.hh'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -30,6 +30,11 @@ def run_generate(args):
     cmdgenerate.run(args)
 
 
+def run_daemon(args):
+    from Pydoc import cmddaemon
+    cmddaemon.run(args)
+
+
 def run_gir(args):
     from Pydoc import cmdgir
     cmdgir.run(args)
@@ -38,7 +43,7 @@ def run_gir(args):
 def print_available_commands():
     sys.stderr.write('Available commands:\n')
 
-    commands = ['inspect', 'serve', 'generate', 'gir']
+    commands = ['inspect', 'serve', 'generate', 'daemon', 'gir']
 
     for c in commands:
         sys.stderr.write('  ' + c + '\n')
@@ -61,6 +66,8 @@ def run():
         run_serve(rest)
     elif cmd == 'generate':
         run_generate(rest)
+    elif cmd == 'daemon':
+        run_daemon(rest)
     elif cmd == 'gir':
         run_gir(rest)
     elif cmd == '--help' or cmd == '-h':
@@ -158,7 +158,6 @@ setup(name='Pydoc',
           ]
       },
       package_data={'Pydoc': datafiles},
-      cmdclass=cmdclass,
-      install_requires=['pyparsing == 2.2.0'])
+      cmdclass=cmdclass)
 
 # vi:ts=4:et